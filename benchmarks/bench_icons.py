@@ -0,0 +1,65 @@
+# bench_icons.py
+# Compare the old per-pixel icon recolor path with the vectorized IconAtlas.
+# Run from the repo root: python benchmarks/bench_icons.py
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from icons import IconAtlas, recolor_icon
+
+ICON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "weather_icons")
+ICON = "thunderstorm.png"
+SIZE = (70, 70)
+
+
+def per_pixel_recolor(icon_path):
+    """The original recolor_icon_to_white loop, kept here as the baseline."""
+    img = Image.open(icon_path).convert("RGBA")
+    data = img.getdata()
+    new_data = []
+    for item in data:
+        if item[3] > 0:
+            new_data.append((255, 255, 255, item[3]))
+        else:
+            new_data.append(item)
+    img.putdata(new_data)
+    return img
+
+
+def main():
+    icon_path = os.path.join(ICON_DIR, ICON)
+
+    # Both paths must produce the same pixels before timing means anything
+    with Image.open(icon_path) as img:
+        assert recolor_icon(img).tobytes() == per_pixel_recolor(icon_path).tobytes()
+
+    def legacy():
+        per_pixel_recolor(icon_path).resize(SIZE)
+
+    def vectorized():
+        with Image.open(icon_path) as img:
+            recolor_icon(img).resize(SIZE)
+
+    atlas = IconAtlas(ICON_DIR)
+    atlas.image(ICON, SIZE)
+
+    def cached():
+        atlas.image(ICON, SIZE)
+
+    runs = 20
+    results = {
+        "per-pixel recolor + resize": timeit.timeit(legacy, number=runs) / runs,
+        "vectorized recolor + resize": timeit.timeit(vectorized, number=runs) / runs,
+        "atlas cache hit": timeit.timeit(cached, number=runs * 100) / (runs * 100),
+    }
+    baseline = results["per-pixel recolor + resize"]
+    for name, seconds in results.items():
+        print(f"{name:30s} {seconds * 1000:9.3f} ms  ({baseline / seconds:8.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# bench_ollama.py
+# Measure cold vs. warm generation latency and the effect of context reuse.
+# Needs a running Ollama server with the model created from MetaPrompt.
+# Run from the repo root: python benchmarks/bench_ollama.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ollama
+
+from config import get_config
+from llm import ModelSession
+
+MODEL = "MirrorAssistant1.0"
+SECTIONS = [
+    "Weather: Kingston, 12°C, Scattered clouds.",
+    "Upcoming Events:\n2025-01-01 09:00: Standup\n2025-01-01 13:00: Dentist\n",
+]
+PROMPTS = ["What's a good breakfast?", "And something quicker?", "Thanks, any tea suggestions?"]
+
+
+def timed_turn(session, prompt):
+    started = time.perf_counter()
+    time_section = f"Current Time: {time.strftime('%I:%M %p, %A, %B %d, %Y')}."
+    response = session.generate(session.build_prompt([time_section] + SECTIONS, prompt))
+    return time.perf_counter() - started, response.prompt_eval_count or 0
+
+
+def main():
+    client = ollama.Client()
+    llm_config = dict(get_config()["llm"])
+
+    # Unload the model so the first request pays the full load cost
+    client.generate(model=MODEL, prompt="", keep_alive=0)
+    session = ModelSession(client, MODEL, llm_config)
+    cold, _ = timed_turn(session, PROMPTS[0])
+    warm, _ = timed_turn(session, PROMPTS[0])
+    print(f"cold first reply  {cold * 1000:9.1f} ms")
+    print(f"warm reply        {warm * 1000:9.1f} ms")
+
+    client.generate(model=MODEL, prompt="", keep_alive=0)
+    session = ModelSession(client, MODEL, llm_config)
+    started = time.perf_counter()
+    session.warm_up()
+    print(f"warm_up()         {(time.perf_counter() - started) * 1000:9.1f} ms")
+    after_warm_up, _ = timed_turn(session, PROMPTS[0])
+    print(f"reply after warm  {after_warm_up * 1000:9.1f} ms")
+
+    for reuse in (False, True):
+        session = ModelSession(client, MODEL, dict(llm_config, reuse_context=reuse))
+        print(f"reuse_context={reuse}")
+        for prompt in PROMPTS:
+            seconds, prompt_tokens = timed_turn(session, prompt)
+            print(f"  {prompt:32s} {seconds * 1000:9.1f} ms  {prompt_tokens:5d} prompt tokens")
+
+
+if __name__ == "__main__":
+    main()
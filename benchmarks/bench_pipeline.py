@@ -0,0 +1,178 @@
+# bench_pipeline.py
+# End-to-end conversation timings against the local fake services, fully offline.
+# Scripted utterances go through the real pipeline, cache, HTTP/Calendar clients and
+# Ollama session; a timed stand-in replaces the TTS engine (or use --real-tts).
+# Run from the repo root: python benchmarks/bench_pipeline.py --turns 5 --latency 0.1 --token-delay 0.02
+import argparse
+import copy
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ollama
+import pyttsx3
+import speech_recognition as sr
+
+import main
+from config import get_config
+from fake_servers import Faults, FakeOllama, start_server
+from intents import IntentRouter
+from llm import ConversationMemory, ModelSession
+from metrics import metrics
+from pipeline import ConversationPipeline
+from tts import SpeechQueue
+
+PROMPTS = [
+    "what should I wear today",
+    "what's on my calendar this afternoon",
+    "any tips for staying focused",
+    "what's the weather like",
+]
+
+
+class ScriptedRecognizer:
+    """Returns scripted utterances from listen(), one per turn, then 'exit'.
+
+    Each utterance 'takes' `speech_seconds` to say; `on_onset` is called when
+    it starts, like the VoiceOnsetDetector does on a real microphone.
+    """
+
+    def __init__(self, prompts, timeline, speech_seconds=1.0):
+        self.prompts = list(prompts) + ["exit"]
+        self.timeline = timeline
+        self.speech_seconds = speech_seconds
+        self.on_onset = lambda: None
+
+    def listen(self, source, timeout=None, phrase_time_limit=None):
+        if not self.prompts:
+            time.sleep(timeout or 1)
+            raise sr.WaitTimeoutError()
+        self.on_onset()
+        time.sleep(self.speech_seconds)
+        self.timeline.append(("heard", time.monotonic()))
+        return self.prompts.pop(0)
+
+
+class PassthroughSTT:
+    def transcribe(self, audio_data):
+        return audio_data
+
+
+class IdleNoiseMonitor:
+    def check(self):
+        return 0.0
+
+
+class TimedEngine:
+    """Stands in for a pyttsx3 engine: 'speaks' at a fixed rate and logs when it starts."""
+
+    def __init__(self, timeline, words_per_second=3.0):
+        self.timeline = timeline
+        self.words_per_second = words_per_second
+        self.text = ""
+
+    def say(self, text):
+        self.text = text
+
+    def runAndWait(self):
+        self.timeline.append(("speaking", time.monotonic()))
+        time.sleep(len(self.text.split()) / self.words_per_second)
+        self.timeline.append(("spoken", time.monotonic()))
+
+    def stop(self):
+        pass
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Offline end-to-end conversation timings")
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake service latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds per LLM token")
+    parser.add_argument("--load-time", type=float, default=1.0, help="cold model load time (s)")
+    parser.add_argument("--speech-seconds", type=float, default=1.0, help="how long each scripted utterance lasts")
+    parser.add_argument("--no-fast-path", action="store_true", help="send time/weather/calendar questions to the model too")
+    parser.add_argument("--no-reuse-context", action="store_true",
+                        help="send history from conversation memory instead of carrying the model context")
+    parser.add_argument("--no-prefetch", action="store_true", help="build the context only after transcription")
+    parser.add_argument("--real-tts", action="store_true", help="speak through pyttsx3 instead of the timed stand-in")
+    args = parser.parse_args()
+
+    faults = {
+        service: Faults(args.latency, args.jitter, args.error_rate)
+        for service in ("weather", "calendar", "ollama")
+    }
+    server = start_server(ollama=FakeOllama(args.token_delay, args.load_time), faults=faults)
+    base = f"http://localhost:{server.server_port}"
+
+    config = copy.deepcopy(get_config())
+    config["weather"]["base_url"] = base
+    config["calendar"]["base_url"] = f"{base}/calendar/v3/"
+    config["llm"]["host"] = base
+    # Wait for each reply to finish so turns don't overlap
+    config["conversation"]["barge_in"] = False
+    config["conversation"]["prefetch_context"] = not args.no_prefetch
+    config["conversation"]["fast_path"] = not args.no_fast_path
+    config["llm"]["reuse_context"] = not args.no_reuse_context
+
+    timeline = []
+    cache = main.build_data_cache(config)
+    memory = None
+    if config["memory"]["enabled"]:
+        memory = ConversationMemory(config["memory"]["budget_tokens"], config["memory"]["summary_tokens"])
+    session = ModelSession(ollama.Client(host=base), main.modelname, config["llm"], memory=memory)
+    session.warm_up()
+    engine_factory = pyttsx3.init if args.real_tts else (lambda: TimedEngine(timeline))
+    prompts = [PROMPTS[i % len(PROMPTS)] for i in range(args.turns)]
+    recognizer = ScriptedRecognizer(prompts, timeline, args.speech_seconds)
+    pipeline = ConversationPipeline(
+        recognizer, None, IdleNoiseMonitor(), PassthroughSTT(),
+        session, SpeechQueue(engine_factory), config,
+        build_context=lambda: main.get_api_context(cache),
+        show=lambda text: None,
+        router=IntentRouter(cache, config["time_format"]) if config["conversation"]["fast_path"] else None,
+    )
+    recognizer.on_onset = pipeline.on_voice_onset
+    runner = threading.Thread(target=pipeline.run, daemon=True)
+    runner.start()
+    runner.join(timeout=60 + args.turns * 30)
+
+    print(f"{'turn':>4s} {'to first word':>14s} {'to reply spoken':>16s}")
+    turn = 0
+    heard = first_word = last_spoken = None
+    for event, at in timeline + [("heard", None)]:
+        if event == "heard":
+            if heard is not None and first_word is not None:
+                turn += 1
+                print(f"{turn:4d} {(first_word - heard) * 1000:11.0f} ms {(last_spoken - heard) * 1000:13.0f} ms")
+            heard, first_word, last_spoken = at, None, None
+        elif event == "speaking" and first_word is None:
+            first_word = at
+        elif event == "spoken":
+            last_spoken = at
+
+    snapshot = metrics.snapshot()
+    print("\nStage latencies:")
+    for name in ("http.weather", "llm.warm_up", "llm.time_to_first_token", "llm.time_to_first_sentence",
+                 "tts.time_to_first_word", "pipeline.listen", "pipeline.stt", "pipeline.context",
+                 "pipeline.generate", "pipeline.speak", "intent.weather"):
+        if name in snapshot["latencies"]:
+            stats = snapshot["latencies"][name]
+            print(f"  {name:28s} n={stats['count']:<4d} p50 {stats['p50_ms']:8.1f} ms"
+                  f"  p95 {stats['p95_ms']:8.1f} ms  p99 {stats['p99_ms']:8.1f} ms")
+    print(f"Cache: {cache.stats()}")
+    print(f"Prompt tokens per turn: {list(session.prompt_token_history)}")
+    counters, gauges = snapshot["counters"], snapshot["gauges"]
+    if "intent.fast_path_share" in gauges:
+        print(f"Fast path: {gauges['intent.fast_path_share']:.0%} of prompts answered without the model")
+    if "prefetch.hit_rate" in gauges:
+        print(f"Context prefetch: hit rate {gauges['prefetch.hit_rate']:.0%}, "
+              f"{counters.get('prefetch.saved_ms', 0)} ms saved over {counters.get('prefetch.hits', 0)} hits")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,125 @@
+# bench_speech_workers.py
+# UI frame timing while the mirror is speaking, with the TTS engine on a thread in
+# this process (the default) versus in a worker process (speech_workers.enabled).
+# Runs on the headless display backend, so no X server is needed. By default a
+# stand-in engine does Python work while it "speaks" (as pyttsx3's driver loop
+# does); --real-tts uses the configured pyttsx3 engine instead.
+# Run from the repo root: python benchmarks/bench_speech_workers.py --sentences 6
+import argparse
+import copy
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless
+from config import get_config
+from speech_workers import ProcessSpeechEngine, build_tts
+from tts import SpeechQueue, make_engine_factory
+
+SENTENCE = "It looks like a cool, cloudy day in Kingston, so a light jacket should do."
+
+
+class BusyEngine:
+    """Stands in for a pyttsx3 engine: holds the interpreter busy while it 'speaks'."""
+
+    words_per_second = 3.0
+
+    def __init__(self):
+        self.text = ""
+        self.stopped = False
+
+    def say(self, text):
+        self.text = text
+
+    def runAndWait(self):
+        self.stopped = False
+        until = time.monotonic() + len(self.text.split()) / self.words_per_second
+        while time.monotonic() < until and not self.stopped:
+            sum(i * i for i in range(2000))
+
+    def stop(self):
+        self.stopped = True
+
+
+class _BusyHandler:
+    def __init__(self, config):
+        self.engine = BusyEngine()
+
+    def speak(self, text):
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def stop(self):
+        self.engine.stop()
+
+
+def build_busy_tts(config):
+    return _BusyHandler(config)
+
+
+def percentile(ordered, pct):
+    return ordered[min(int(pct / 100 * len(ordered)), len(ordered) - 1)]
+
+
+def measure_frames(engine_factory, sentences, frame_ms):
+    """Speak `sentences` sentences and return the frame intervals (ms) seen meanwhile."""
+    root = headless.Tk()
+    speech = SpeechQueue(engine_factory)
+    intervals = []
+    last = [time.monotonic()]
+
+    def frame():
+        now = time.monotonic()
+        intervals.append((now - last[0]) * 1000)
+        last[0] = now
+        # A small amount of per-frame UI work, like a dispatcher flush
+        "".join(str(i) for i in range(200))
+        root.after(frame_ms, frame)
+
+    def speak():
+        for _ in range(sentences):
+            speech.say(SENTENCE)
+        speech.wait()
+        root.after(0, root.destroy)
+
+    # Let the engine come up (a worker process takes a moment to spawn) before timing frames
+    speech.say("Ready.")
+    speech.wait()
+    root.after(frame_ms, frame)
+    threading.Thread(target=speak, daemon=True).start()
+    root.mainloop()
+    return sorted(intervals[1:])
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="UI frame timing during speech: threaded vs worker-process TTS")
+    parser.add_argument("--sentences", type=int, default=4)
+    parser.add_argument("--frame-ms", type=int, default=16, help="target frame interval")
+    parser.add_argument("--real-tts", action="store_true", help="use the configured pyttsx3 engine")
+    args = parser.parse_args()
+
+    config = copy.deepcopy(get_config())
+    if args.real_tts:
+        threaded_factory = make_engine_factory(config["tts"])
+        build = build_tts
+    else:
+        threaded_factory = BusyEngine
+        build = build_busy_tts
+    modes = {
+        "threaded": threaded_factory,
+        "process": lambda: ProcessSpeechEngine(config, build=build),
+    }
+
+    print(f"{'mode':10s} {'frames':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s} {'late':>6s}")
+    for mode, factory in modes.items():
+        intervals = measure_frames(factory, args.sentences, args.frame_ms)
+        late = sum(1 for interval in intervals if interval > 2 * args.frame_ms)
+        print(f"{mode:10s} {len(intervals):7d} {percentile(intervals, 50):8.1f} {percentile(intervals, 95):8.1f} "
+              f"{percentile(intervals, 99):8.1f} {intervals[-1]:8.1f} {late:6d}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,78 @@
+# bench_stt.py
+# Transcribe WAV fixtures with each STT backend and compare latency and accuracy.
+# Each fixture is a .wav file with the expected transcript in a .txt file of the same name.
+# Run from the repo root: python benchmarks/bench_stt.py [path/to/fixtures] --backends google vosk
+# (defaults to the short clips in benchmarks/fixtures/stt)
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import speech_recognition as sr
+
+from config import get_config
+from stt import backends, create_backend
+
+
+def word_error_rate(expected, actual):
+    """Word-level edit distance divided by the number of expected words."""
+    ref = expected.lower().split()
+    hyp = actual.lower().split()
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (ref_word != hyp_word))
+    return row[-1] / max(len(ref), 1)
+
+
+def load_fixtures(fixture_dir):
+    fixtures = []
+    for wav_path in sorted(glob.glob(os.path.join(fixture_dir, "*.wav"))):
+        txt_path = os.path.splitext(wav_path)[0] + ".txt"
+        expected = open(txt_path).read().strip() if os.path.exists(txt_path) else ""
+        with sr.AudioFile(wav_path) as source:
+            audio = sr.Recognizer().record(source)
+        fixtures.append((os.path.basename(wav_path), audio, expected))
+    return fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare STT backends on WAV fixtures")
+    parser.add_argument("fixture_dir", nargs="?", default=os.path.join(os.path.dirname(__file__), "fixtures", "stt"))
+    parser.add_argument("--backends", nargs="+", default=list(backends))
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixture_dir)
+    if not fixtures:
+        print(f"No .wav fixtures found in {args.fixture_dir}")
+        return
+
+    stt_config = get_config()["stt"]
+    recognizer = sr.Recognizer()
+    for name in args.backends:
+        try:
+            backend = create_backend(name, recognizer, stt_config)
+        except Exception as e:
+            print(f"{name}: unavailable ({e})")
+            continue
+        latencies, errors = [], []
+        for fixture, audio, expected in fixtures:
+            started = time.perf_counter()
+            try:
+                text = backend.transcribe(audio)
+            except (sr.UnknownValueError, sr.RequestError):
+                text = ""
+            latencies.append(time.perf_counter() - started)
+            errors.append(word_error_rate(expected, text))
+            print(f"  {name:8s} {fixture:30s} {latencies[-1] * 1000:8.1f} ms  WER {errors[-1]:.2f}  {text!r}")
+        latencies.sort()
+        print(f"{name}: mean {sum(latencies) / len(latencies) * 1000:.1f} ms, "
+              f"max {latencies[-1] * 1000:.1f} ms, mean WER {sum(errors) / len(errors):.2f}")
+
+
+if __name__ == "__main__":
+    main()
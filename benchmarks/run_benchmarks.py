@@ -0,0 +1,188 @@
+# run_benchmarks.py
+# Micro-benchmarks for the mirror's hot display and prompt functions.
+# Runs offline against fixture data and stub widgets (no display needed).
+#
+#   python benchmarks/run_benchmarks.py           compare against baselines.json
+#   python benchmarks/run_benchmarks.py --save    record new baselines
+#
+# Baselines are machine specific: save them on the device you tune for (e.g. the Pi)
+# and compare there. A benchmark slower than its baseline by more than --threshold
+# is reported as a regression and the script exits with status 1.
+import argparse
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main
+from cache import DataCache
+from clock import Clock
+from icons import WHITE, IconAtlas
+from transcript import Transcript
+from ui_dispatch import UIDispatcher
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+BASELINES = os.path.join(HERE, "baselines.json")
+
+
+# --- Stub widgets ---
+class StubLabel:
+    """Stands in for tk.Label: remembers its options and ignores timers."""
+
+    def __init__(self):
+        self.options = {}
+
+    def config(self, **options):
+        self.options.update(options)
+
+    def after(self, ms, func=None, *args):
+        pass
+
+
+class StubText:
+    """Stands in for tk.Text with just enough of the index API for Transcript."""
+
+    def __init__(self):
+        self.lines = [""]
+
+    def insert(self, index, text):
+        head, *rest = text.split("\n")
+        self.lines[-1] += head
+        self.lines.extend(rest)
+
+    def index(self, index):
+        return f"{len(self.lines)}.0"
+
+    def get(self, start, end):
+        return "\n".join(self.lines[:int(end.split(".")[0]) - 1]) + "\n"
+
+    def delete(self, start, end):
+        del self.lines[:int(end.split(".")[0]) - 1]
+
+    def see(self, index):
+        pass
+
+
+class StubRoot:
+    """Collects after() callbacks so the benchmark can run them explicitly."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, func=None, *args):
+        self.callbacks.append((func, args))
+
+    def run_pending(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for func, args in callbacks:
+            func(*args)
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return json.load(f)
+
+
+# --- Benchmarks ---
+def build_benchmarks():
+    weather = load_fixture("weather.json")
+    events = load_fixture("calendar_events.json")
+    icon_file = main.weather_icon_map[weather["description"].lower()]
+    icon_path = os.path.join(main.weather_icon_dir, icon_file)
+
+    # update_weather with a warm atlas; a placeholder stands in for the PhotoImage
+    atlas = IconAtlas(main.weather_icon_dir)
+    atlas.photos[(icon_file, main.weather_icon_size, WHITE)] = object()
+    main.icon_atlas = atlas
+    weather_labels = (StubLabel(), StubLabel(), StubLabel())
+
+    calendar_label = StubLabel()
+
+    cache = DataCache()
+    cache.register("weather", lambda: weather, ttl=3600)
+    cache.register("calendar", lambda: events, ttl=3600)
+
+    clock = Clock(StubLabel(), StubLabel(), 24)
+
+    transcript = Transcript(StubText(), max_lines=200)
+    for i in range(300):
+        transcript.append(f"\nline {i}")
+
+    root = StubRoot()
+    dispatcher = UIDispatcher(root, max_hz=1e9)
+    stream_transcript = Transcript(StubText(), max_lines=200)
+
+    def dispatch_streamed_reply():
+        dispatcher.append(stream_transcript, "\nAssistant Response: ")
+        for token in "It is cool and cloudy, so a light jacket should do.".split(" "):
+            dispatcher.append(stream_transcript, token + " ")
+        root.run_pending()
+
+    return {
+        "recolor_icon_to_white": lambda: main.recolor_icon_to_white(icon_path),
+        "icon_load_resize_cold": lambda: IconAtlas(main.weather_icon_dir).image(icon_file, main.weather_icon_size),
+        "icon_load_resize_cached": lambda: atlas.image(icon_file, main.weather_icon_size),
+        "update_weather": lambda: main.update_weather(*weather_labels, weather),
+        "update_calendar": lambda: main.update_calendar(calendar_label, events),
+        "get_api_context": lambda: main.get_api_context(cache),
+        "clock_tick": clock.tick,
+        "transcript_append_full": lambda: transcript.append("\nYou said: what time is it"),
+        "dispatch_streamed_reply": dispatch_streamed_reply,
+    }
+
+
+def measure(func, repeat=5):
+    """Return the best per-call time in seconds over `repeat` timed batches."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the mirror's hot functions")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baselines")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before flagging (0.25 = 25%%)")
+    parser.add_argument("names", nargs="*", help="only run these benchmarks")
+    args = parser.parse_args()
+
+    baselines = {}
+    if os.path.exists(BASELINES):
+        with open(BASELINES) as f:
+            baselines = json.load(f)
+
+    benchmarks = build_benchmarks()
+    results = {}
+    regressions = []
+    print(f"{'benchmark':28s} {'us/call':>10s} {'baseline':>10s} {'change':>8s}")
+    for name, func in benchmarks.items():
+        if args.names and name not in args.names:
+            continue
+        seconds = measure(func)
+        results[name] = seconds * 1e6
+        baseline = baselines.get(name)
+        if baseline:
+            change = results[name] / baseline - 1
+            flag = "  REGRESSION" if change > args.threshold else ""
+            if flag:
+                regressions.append(name)
+            print(f"{name:28s} {results[name]:10.2f} {baseline:10.2f} {change:+7.0%}{flag}")
+        else:
+            print(f"{name:28s} {results[name]:10.2f} {'-':>10s} {'-':>8s}")
+
+    if args.save:
+        baselines.update({name: round(us, 2) for name, us in results.items()})
+        with open(BASELINES, "w") as f:
+            json.dump(baselines, f, indent=4, sort_keys=True)
+            f.write("\n")
+        print(f"Saved baselines to {BASELINES}")
+    elif regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,64 @@
+# soak_transcript.py
+# Append simulated conversation turns to the bounded transcript for a long
+# stretch and check that memory and insert latency stay flat.
+# Needs a display (or Xvfb) unless run with --headless, which uses the off-screen
+# widgets. Run from the repo root: python benchmarks/soak_transcript.py --turns 100000
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcript import Transcript
+
+TURN = [
+    "\nListening for your prompt...",
+    "\nYou said: what should I wear today",
+    "\nAssistant Response: ",
+    *"It is cool and cloudy, so a light jacket should do. ".split(" "),
+    "\n",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test for the bounded transcript")
+    parser.add_argument("--turns", type=int, default=20000)
+    parser.add_argument("--report-every", type=int, default=2000)
+    parser.add_argument("--max-lines", type=int, default=200)
+    parser.add_argument("--headless", action="store_true", help="use the off-screen widgets instead of Tk")
+    args = parser.parse_args()
+
+    if args.headless:
+        import headless as ui
+        root = ui.Tk()
+    else:
+        ui = tk
+        root = ui.Tk()
+        root.withdraw()
+    widget = ui.Text(root, wrap="word")
+    transcript = Transcript(widget, max_lines=args.max_lines)
+
+    tracemalloc.start()
+    print(f"{'turns':>8s} {'us/append':>10s} {'widget lines':>13s} {'traced KiB':>11s}")
+    started = time.perf_counter()
+    appends = 0
+    for turn in range(1, args.turns + 1):
+        for text in TURN:
+            transcript.append(text)
+            appends += 1
+        if turn % args.report_every == 0:
+            root.update()
+            elapsed = time.perf_counter() - started
+            lines = int(widget.index("end-1c").split(".")[0])
+            current, _ = tracemalloc.get_traced_memory()
+            print(f"{turn:8d} {elapsed / appends * 1e6:10.1f} {lines:13d} {current / 1024:11.1f}")
+            started = time.perf_counter()
+            appends = 0
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# cache.py
+import threading
+import time
+
+
+class DataCache:
+    """In-process cache with per-source TTLs and stale-while-revalidate.
+
+    Fresh entries are returned as-is. Stale entries are still returned right
+    away, and a background refresh is started so the next read is fresh. Only
+    a source that has never been loaded blocks the caller. After a failed
+    load, reads return what is cached (None if nothing ever loaded) without
+    trying again for `error_ttl` seconds, so an offline mirror doesn't wait
+    on the network for every read.
+
+    Background refreshes are started with `spawn(func, *args)`; main.py
+    points it at the I/O engine (timeouts, cancelled at shutdown) once that
+    is running. Until then, and by default, each one gets its own thread.
+    """
+
+    def __init__(self, spawn=None):
+        self.lock = threading.Lock()
+        self.sources = {}
+        self.spawn = spawn or (lambda func, *args: threading.Thread(target=func, args=args, daemon=True).start())
+
+    def register(self, name, loader, ttl, error_ttl=30):
+        """Register a loader for `name` whose result stays fresh for `ttl` seconds."""
+        self.sources[name] = {
+            "loader": loader,
+            "ttl": ttl,
+            "error_ttl": error_ttl,
+            "value": None,
+            "loaded_at": None,
+            "failed_at": None,
+            "refreshing": False,
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "errors": 0,
+        }
+
+    def get(self, name):
+        """Return the cached value, loading or revalidating it as needed."""
+        source = self.sources[name]
+        with self.lock:
+            loaded_at = source["loaded_at"]
+            failed_at = source["failed_at"]
+            backing_off = failed_at is not None and time.monotonic() - failed_at < source["error_ttl"]
+            if loaded_at is None:
+                source["misses"] += 1
+                if backing_off:
+                    return None
+            elif time.monotonic() - loaded_at <= source["ttl"]:
+                source["hits"] += 1
+                return source["value"]
+            else:
+                source["stale_hits"] += 1
+                start_refresh = not source["refreshing"] and not backing_off
+                source["refreshing"] = source["refreshing"] or start_refresh
+        if loaded_at is None:
+            return self.refresh(name)
+        if start_refresh:
+            self.spawn(self._revalidate, name)
+        return source["value"]
+
+    def peek(self, name):
+        """Return whatever is cached without loading or counting a read."""
+        return self.sources[name]["value"]
+
+    def refresh(self, name):
+        """Load `name` now and store the result; keeps the old value on failure."""
+        source = self.sources[name]
+        try:
+            value = source["loader"]()
+        except Exception as e:
+            print(f"Error refreshing {name}: {e}")
+            value = None
+        with self.lock:
+            if value is None:
+                source["errors"] += 1
+                source["failed_at"] = time.monotonic()
+                return source["value"]
+            source["value"] = value
+            source["loaded_at"] = time.monotonic()
+            source["failed_at"] = None
+        return value
+
+    def _revalidate(self, name):
+        try:
+            self.refresh(name)
+        finally:
+            with self.lock:
+                self.sources[name]["refreshing"] = False
+
+    def age(self, name):
+        """Seconds since `name` was last loaded, or None if it never was."""
+        loaded_at = self.sources[name]["loaded_at"]
+        return None if loaded_at is None else time.monotonic() - loaded_at
+
+    def stats(self):
+        """Return hit/miss counters and the current age of each source."""
+        with self.lock:
+            stats = {}
+            for name, source in self.sources.items():
+                age = self.age(name)
+                stats[name] = {
+                    "hits": source["hits"],
+                    "stale_hits": source["stale_hits"],
+                    "misses": source["misses"],
+                    "errors": source["errors"],
+                    "age_s": None if age is None else round(age, 1),
+                    "ttl_s": source["ttl"],
+                }
+            return stats
@@ -0,0 +1,141 @@
+# calendar_client.py
+import os
+import pickle
+import threading
+from datetime import datetime, timedelta, timezone
+
+from google.auth.credentials import AnonymousCredentials
+from google.auth.transport.requests import Request
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from metrics import metrics
+
+SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
+
+
+def event_time(when):
+    """Turn an event's start/end ({'dateTime': ...} or {'date': ...}) into an aware datetime."""
+    if 'dateTime' in when:
+        return datetime.fromisoformat(when['dateTime'].replace('Z', '+00:00'))
+    # All-day events only have a date; treat it as local midnight
+    return datetime.fromisoformat(when['date']).astimezone()
+
+
+class CalendarClient:
+    """Long-lived Google Calendar client with incremental sync.
+
+    Credentials are loaded once and refreshed shortly before they expire, and
+    the discovery service is built once. The first poll does a full listing;
+    later polls send the `syncToken` from the previous one so only changed
+    events come back. Only events starting within `horizon_days` are listed
+    and kept; since a sync token can't carry a time window, a fresh full
+    listing is done once half of that window has passed. Events are kept in
+    memory and the upcoming ones are returned in start order. Pass `base_url` to talk to a stand-in server
+    (see fake_servers.py) instead of Google; no OAuth is done in that case.
+    """
+
+    def __init__(self, credentials_file, token_file='token.pickle', calendar_id='primary',
+                 max_results=5, refresh_margin=300, horizon_days=14, base_url=None):
+        self.credentials_file = credentials_file
+        self.token_file = token_file
+        self.calendar_id = calendar_id
+        self.max_results = max_results
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self.horizon = timedelta(days=horizon_days)
+        self.base_url = base_url
+        self.lock = threading.Lock()
+        self.creds = None
+        self.service = None
+        self.sync_token = None
+        self.window_end = None
+        self.events = {}
+
+    # --- Credentials and service ---
+    def _save_credentials(self):
+        with open(self.token_file, 'wb') as token:
+            pickle.dump(self.creds, token)
+
+    def _credentials(self):
+        """Return valid credentials, refreshing them before they expire."""
+        if self.base_url:
+            if self.creds is None:
+                self.creds = AnonymousCredentials()
+            return self.creds
+        if self.creds is None and os.path.exists(self.token_file):
+            with open(self.token_file, 'rb') as token:
+                self.creds = pickle.load(token)
+        if self.creds and self.creds.refresh_token:
+            expiry = self.creds.expiry
+            # google-auth stores expiry as naive UTC
+            if not self.creds.valid or (expiry and expiry - datetime.utcnow() < self.refresh_margin):
+                self.creds.refresh(Request())
+                metrics.incr("calendar.token_refreshes")
+                self._save_credentials()
+        if not self.creds or not self.creds.valid:
+            flow = InstalledAppFlow.from_client_secrets_file(self.credentials_file, SCOPES)
+            self.creds = flow.run_local_server(port=0)
+            self._save_credentials()
+        return self.creds
+
+    def _service(self):
+        creds = self._credentials()
+        if self.service is None:
+            client_options = {"api_endpoint": self.base_url} if self.base_url else None
+            self.service = build('calendar', 'v3', credentials=creds, client_options=client_options)
+        return self.service
+
+    # --- Sync ---
+    def _list(self, **params):
+        """Page through events().list and return (items, nextSyncToken)."""
+        items = []
+        page_token = None
+        while True:
+            result = self._service().events().list(
+                calendarId=self.calendar_id, singleEvents=True, pageToken=page_token, **params
+            ).execute()
+            items.extend(result.get('items', []))
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                return items, result.get('nextSyncToken')
+
+    def _sync(self):
+        now = datetime.now(timezone.utc)
+        if self.sync_token and self.window_end - now < self.horizon / 2:
+            # Events that have moved into the horizon since the last full listing
+            # never come back as changes, so list the window again
+            self.sync_token = None
+        if self.sync_token:
+            try:
+                items, self.sync_token = self._list(syncToken=self.sync_token)
+                metrics.incr("calendar.incremental_syncs")
+                metrics.incr("calendar.changed_events", len(items))
+                return items
+            except HttpError as e:
+                if e.resp.status != 410:
+                    raise
+                # Sync token expired; start over with a full listing
+                self.sync_token = None
+        self.events = {}
+        self.window_end = now + self.horizon
+        items, self.sync_token = self._list(timeMin=now.isoformat(), timeMax=self.window_end.isoformat())
+        metrics.incr("calendar.full_syncs")
+        return items
+
+    def upcoming_events(self):
+        """Sync with the server and return the next `max_results` events."""
+        with self.lock:
+            for event in self._sync():
+                # Incremental results aren't limited to the window; keep only what the full listing would
+                if event.get('status') == 'cancelled' or event_time(event['start']) >= self.window_end:
+                    self.events.pop(event['id'], None)
+                else:
+                    self.events[event['id']] = event
+            now = datetime.now(timezone.utc)
+            # Drop events that are over; with the horizon above this keeps memory bounded
+            for event_id, event in list(self.events.items()):
+                if event_time(event['end']) <= now:
+                    del self.events[event_id]
+            upcoming = sorted(self.events.values(), key=lambda event: event_time(event['start']))
+            return upcoming[:self.max_results]
@@ -0,0 +1,66 @@
+# clock.py
+import time
+from datetime import datetime
+
+from metrics import metrics
+
+
+class Clock:
+    """Drive the time and date labels, waking up only when the displayed text can change.
+
+    The next tick is scheduled for just after the next minute boundary, and a
+    label is only reconfigured when its text actually differs. Waits are
+    capped at `resync` seconds so a system sleep or an NTP jump is corrected
+    quickly; a tick that lands more than a second away from when it was due
+    is counted as clock.corrections.
+    """
+
+    # Fire slightly after the boundary so strftime already shows the new minute
+    margin = 0.02
+
+    def __init__(self, time_label, date_label, time_format, resync=15):
+        self.time_label = time_label
+        self.date_label = date_label
+        self.time_format = "%H:%M" if time_format == 24 else "%I:%M %p"
+        self.resync = resync
+        self.time_text = None
+        self.date_text = None
+        self.due = None
+        self.started = time.time()
+        self.wakeups = 0
+        self.redraws = 0
+
+    def tick(self):
+        now = time.time()
+        self.wakeups += 1
+        metrics.incr("clock.wakeups")
+        if self.due is not None and abs(now - self.due) > 1:
+            metrics.incr("clock.corrections")
+
+        current = datetime.fromtimestamp(now)
+        time_text = current.strftime(self.time_format)
+        if time_text != self.time_text:
+            self.time_text = time_text
+            self.time_label.config(text=time_text)
+            self._redrawn()
+            date_text = current.strftime("%A, %B %d")
+            if date_text != self.date_text:
+                self.date_text = date_text
+                self.date_label.config(text=date_text)
+                self._redrawn()
+
+        delay = min(60 - now % 60 + self.margin, self.resync)
+        self.due = now + delay
+        self.time_label.after(int(delay * 1000), self.tick)
+
+    def _redrawn(self):
+        self.redraws += 1
+        metrics.incr("clock.redraws")
+
+    def stats(self):
+        """Wakeups and redraws per hour since the clock started."""
+        hours = max(time.time() - self.started, 1) / 3600
+        return {
+            "wakeups_per_hour": round(self.wakeups / hours, 1),
+            "redraws_per_hour": round(self.redraws / hours, 1),
+        }
@@ -1,17 +1,127 @@
 # config.py
 
 config = {
-    "address": "localhost",  # Address to bind the application
-    "port": 8080,  # Port number
+    "address": "localhost",  # Address the status server binds to ("0.0.0.0" to reach it from other machines)
+    "port": 8080,  # Port for the status server (GET /status and /metrics)
     "language": "en",
     "units": "metric",  # Units for weather ("metric" for Celsius, "imperial" for Fahrenheit)
     "weather": {
         "api_key": "2cf8cf9ed9af67c236990163ece2b97a",
         "lat": 44.2312,
         "lon": -76.4860,
-        "units": "metric"
+        "units": "metric",
+        # Point at a stand-in server for offline testing, e.g. "http://localhost:8765"
+        # (python fake_servers.py)
+        "base_url": "http://api.openweathermap.org",
     },
     "time_format": 24,  # 24-hour or 12-hour time format
+    "clock": {
+        "resync": 15,  # Max seconds between clock wakeups, to catch sleep/NTP jumps quickly
+    },
+    "calendar": {
+        "max_results": 5,  # Number of upcoming events to show
+        "horizon_days": 14,  # Only events starting within this many days are synced
+        "refresh_margin": 300,  # Refresh the OAuth token this many seconds before it expires
+        # Point at a stand-in server for offline testing, e.g. "http://localhost:8765/calendar/v3/"
+        # (python fake_servers.py). None talks to Google.
+        "base_url": None,
+    },
+    "status_server": {
+        "enabled": True,
+        "transcript_lines": 20,  # Most recent conversation lines included in /status
+    },
+    "metrics": {
+        "window": 512,  # Recent samples kept per timer for p50/p95/p99
+        "dump_path": None,  # File the snapshot is written to on exit, e.g. "metrics.json"; None to skip
+    },
+    "scheduler": {
+        "workers": 4,  # Worker threads for blocking I/O (fetches, model warm-up) run by the engine
+        # Intervals, jitter and timeouts are in seconds
+        "weather": {"interval": 600, "jitter": 30, "timeout": 30},
+        "calendar": {"interval": 600, "jitter": 30, "timeout": 30},
+    },
+    "http": {
+        "connect_timeout": 3,  # Seconds
+        "read_timeout": 5,  # Seconds
+        "retries": 2,  # Extra attempts after a connection error, timeout or 429/5xx
+        "backoff": 0.5,  # Seconds before the first retry; doubles on each attempt
+        "pool_size": 4,  # Keep-alive connections kept per host
+    },
+    "cache": {
+        # Seconds before cached data is considered stale (stale data is still
+        # served while a refresh runs in the background)
+        "weather_ttl": 600,
+        "calendar_ttl": 600,
+        # Seconds reads stop retrying a source after a failed fetch (e.g. offline at boot)
+        "error_ttl": 30,
+        # Seconds a background refresh or context prefetch may run on the engine before it is abandoned
+        "refresh_timeout": 30,
+    },
+    "microphone": {
+        "device_index": None,  # None for the default input device
+        "calibration_duration": 2,  # Seconds of ambient noise measured for a full calibration
+        "probe_duration": 0.15,  # Seconds sampled before each turn to track the noise floor
+        "drift_ratio": 1.5,  # Recalibrate when the floor moves by more than this factor
+        "smoothing": 0.3,  # Weight of each new probe in the noise-floor estimate
+    },
+    "stt": {
+        "backend": "google",  # "google" (online) or "vosk" (offline)
+        # Used when the backend can't be reached, e.g. "vosk" once vosk_model is downloaded; None to disable
+        "fallback": None,
+        "language": "en-US",
+        "vosk_model": "models/vosk-model-small-en-us-0.15",  # Path to an unpacked Vosk model
+    },
+    "tts": {
+        # Replay phrases that keep coming back (template answers, prompts) from cached audio
+        "cache": True,
+        "min_uses": 2,  # Times a phrase is spoken live before it is rendered and cached
+        "memory_max_mb": 32,
+        "disk_dir": None,  # e.g. "tts_cache" to keep clips across restarts; None for memory only
+        "disk_max_mb": 256,
+    },
+    "speech_workers": {
+        # Run recognition and synthesis in child processes so they don't share the GIL with Tk
+        "enabled": False,
+        "call_timeout": 60,  # Seconds before a transcribe/speak call is treated as hung
+        "health_interval": 5,  # Seconds between health pings
+        "health_timeout": 2,  # Seconds to answer a ping before the worker is restarted
+    },
+    "ui": {
+        "max_hz": 30,  # Max redraws per second for text streamed into the conversation widget
+        # Milliseconds between UI lag checks (ui.lag / ui.stalls), e.g. 100 while profiling.
+        # Each check wakes the Tk thread, so None (off) keeps an idle display idle.
+        "lag_check_ms": None,
+    },
+    "transcript": {
+        "max_lines": 200,  # Lines kept in the conversation widget
+        "spill_path": None,  # File to append trimmed lines to, e.g. "transcript.log"; None to discard
+    },
+    "conversation": {
+        # Keep listening while replying so a new utterance (or "stop") cuts the reply off.
+        # Needs a headset or a mic with echo cancellation: with an open speaker the mic
+        # hears the reply itself and the mirror ends up answering its own sentences.
+        "barge_in": False,
+        "phrase_time_limit": 60,  # Max seconds per utterance
+        # Answer plain time/date/weather/calendar questions from local data instead of the model
+        "fast_path": True,
+        # Build the weather/calendar context while the user is still speaking
+        "prefetch_context": True,
+        "prefetch_max_age": 30,  # Seconds a prefetched context stays usable
+    },
+    "llm": {
+        "host": None,  # Ollama server URL; None uses OLLAMA_HOST or http://localhost:11434
+        "stream": True,  # Show and speak the reply while it is still being generated
+        "keep_alive": "30m",  # How long Ollama keeps the model loaded after a request (-1 = forever)
+        "reuse_context": True,  # Carry the model context between turns instead of re-sending everything
+        "max_context_tokens": 4096,  # Start a fresh context once the carried one grows past this
+    },
+    "memory": {
+        # Keep recent turns for follow-up questions; replayed into the prompt whenever no
+        # model context is carried (reuse_context off, or after max_context_tokens resets it)
+        "enabled": True,
+        "budget_tokens": 1024,  # Recent turns kept verbatim
+        "summary_tokens": 256,  # Older turns compacted into one-line notes
+    },
 }
 
 def get_config():
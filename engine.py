@@ -0,0 +1,133 @@
+# engine.py
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import metrics
+
+
+class AsyncEngine:
+    """An asyncio event loop on a dedicated thread that owns the mirror's I/O.
+
+    Coroutines are handed to it from any thread with submit(), which
+    returns a concurrent.futures.Future. Blocking library calls (requests,
+    the Google client, Ollama) run through run_blocking() on the loop's
+    worker pool, so independent fetches overlap instead of queuing;
+    spawner() wraps that up for code that just wants to start one.
+
+    Every task started through the engine is tracked; shutdown() cancels
+    whatever is still running and waits for it to unwind.
+    """
+
+    def __init__(self, workers=4):
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="io")
+        self.loop.set_default_executor(self.executor)
+        self.tasks = set()
+        self.thread = threading.Thread(target=self._run, name="engine", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule `coro` on the engine loop. Safe to call from any thread."""
+        return asyncio.run_coroutine_threadsafe(self._tracked(coro), self.loop)
+
+    async def run_blocking(self, func, *args, timeout=None):
+        """Await `func(*args)` on the worker pool, giving up after `timeout` seconds.
+
+        A timed-out call can't be interrupted; its thread finishes in the
+        background and the result is dropped.
+        """
+        return await asyncio.wait_for(self.loop.run_in_executor(None, func, *args), timeout)
+
+    def spawner(self, timeout=None):
+        """Return spawn(func, *args): start `func(*args)` via run_blocking without waiting.
+
+        Safe to call from any thread. A call still running after `timeout`
+        seconds is given up on and counted as engine.spawn_timeouts.
+        """
+        def spawn(func, *args):
+            future = self.submit(self.run_blocking(func, *args, timeout=timeout))
+            future.add_done_callback(self._spawn_done)
+        return spawn
+
+    @staticmethod
+    def _spawn_done(future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if isinstance(error, asyncio.TimeoutError):
+            metrics.incr("engine.spawn_timeouts")
+        elif error is not None:
+            print(f"Error in background task: {error}")
+
+    async def _tracked(self, coro):
+        task = asyncio.current_task()
+        self.tasks.add(task)
+        metrics.set("engine.tasks", len(self.tasks))
+        try:
+            return await coro
+        finally:
+            self.tasks.discard(task)
+            metrics.set("engine.tasks", len(self.tasks))
+
+    async def _cancel_all(self):
+        tasks = [task for task in self.tasks if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def shutdown(self, timeout=5):
+        """Cancel all engine tasks, stop the loop and release the worker pool."""
+        if not self.loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._cancel_all(), self.loop).result(timeout)
+        except Exception as e:
+            print(f"Error shutting down engine tasks: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class TkBridge:
+    """Run callables on the Tk thread on behalf of other threads.
+
+    call() queues the function; a single after(0) drains everything queued
+    since the last drain, so nothing polls while there is no work.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.calls = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.scheduled = False
+
+    def call(self, func, *args):
+        """Queue `func(*args)` to run on the Tk thread. Safe to call from any thread."""
+        self.calls.put((func, args))
+        with self.lock:
+            if self.scheduled:
+                return
+            self.scheduled = True
+        self.root.after(0, self._drain)
+
+    def _drain(self):
+        with self.lock:
+            self.scheduled = False
+        while True:
+            try:
+                func, args = self.calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"Error in UI callback {getattr(func, '__name__', func)}: {e}")
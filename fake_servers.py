@@ -0,0 +1,279 @@
+# fake_servers.py
+# Local stand-ins for the mirror's external services (OpenWeatherMap, Google
+# Calendar and Ollama), for offline testing and load testing. One server
+# answers for all three; point the base URLs in config.py at it.
+# Run from the repo root, e.g.: python fake_servers.py --port 8765 --latency 0.2 --error-rate 0.05
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class Faults:
+    """Latency, jitter, error rate and payload padding applied to a fake service."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, payload_bytes=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.payload_bytes = payload_bytes
+
+    def delay(self):
+        time.sleep(max(self.latency + random.uniform(-self.jitter, self.jitter), 0))
+
+    def should_fail(self):
+        return random.random() < self.error_rate
+
+    def pad(self, body):
+        if self.payload_bytes:
+            body["padding"] = "x" * self.payload_bytes
+        return body
+
+
+class FakeCalendar:
+    """In-memory calendar that speaks enough of the Calendar v3 events API for CalendarClient.
+
+    Every change bumps a version number; a sync token is just the version at
+    the time of the listing, so an incremental request returns the events
+    (including deletions) changed after it. expire_sync_tokens() makes every
+    outstanding token answer 410 Gone, like Google does when a token expires.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = 0
+        self.oldest_token = 0
+        self.events = {}
+
+    def put_event(self, event_id, summary, start, end):
+        with self.lock:
+            self.version += 1
+            self.events[event_id] = (self.version, {
+                "id": event_id,
+                "status": "confirmed",
+                "summary": summary,
+                "start": {"dateTime": start.isoformat()},
+                "end": {"dateTime": end.isoformat()},
+            })
+
+    def delete_event(self, event_id):
+        with self.lock:
+            self.version += 1
+            self.events[event_id] = (self.version, {"id": event_id, "status": "cancelled"})
+
+    def expire_sync_tokens(self):
+        with self.lock:
+            self.oldest_token = self.version + 1
+
+    def list_events(self, params):
+        """Return (status, body) for an events().list request."""
+        with self.lock:
+            if "syncToken" in params:
+                token = int(params["syncToken"])
+                if token < self.oldest_token:
+                    return 410, {"error": {"code": 410, "message": "Sync token is no longer valid"}}
+                items = [event for version, event in self.events.values() if version > token]
+            else:
+                time_min, time_max = params.get("timeMin"), params.get("timeMax")
+                time_min = datetime.fromisoformat(time_min) if time_min else None
+                time_max = datetime.fromisoformat(time_max) if time_max else None
+                items = [
+                    event for _, event in self.events.values()
+                    if event["status"] == "confirmed"
+                    and (time_min is None or datetime.fromisoformat(event["end"]["dateTime"]) > time_min)
+                    and (time_max is None or datetime.fromisoformat(event["start"]["dateTime"]) < time_max)
+                ]
+            return 200, {"kind": "calendar#events", "items": items, "nextSyncToken": str(self.version)}
+
+    def seed(self, count=5):
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        for i in range(count):
+            start = now + timedelta(hours=i + 1)
+            self.put_event(f"event{i}", f"Sample event {i + 1}", start, start + timedelta(minutes=30))
+
+
+class FakeWeather:
+    """Answers OpenWeatherMap's /data/2.5/weather with a fixed report and an ETag."""
+
+    def __init__(self, location="Kingston", temperature=12.3, description="scattered clouds"):
+        self.report = {
+            "weather": [{"id": 802, "main": "Clouds", "description": description}],
+            "main": {"temp": temperature},
+            "name": location,
+        }
+
+    def current(self, params):
+        return 200, dict(self.report, coord={"lat": params.get("lat"), "lon": params.get("lon")})
+
+
+class FakeOllama:
+    """Answers /api/generate like an Ollama server, streaming a canned reply token by token.
+
+    `token_delay` is the time per generated token and `load_time` is paid by
+    the first request after start (or after a keep_alive of 0 unloads the
+    model), so cold and warm behaviour can both be reproduced.
+    """
+
+    reply = ("It looks like a cool, cloudy day in Kingston, so a light jacket should do. "
+             "You have a standup at nine and the dentist this afternoon. Anything else?")
+
+    def __init__(self, token_delay=0.03, load_time=2.0):
+        self.token_delay = token_delay
+        self.load_time = load_time
+        self.loaded = False
+
+    def generate(self, body):
+        """Yield the response chunks for a generate request."""
+        if not self.loaded:
+            time.sleep(self.load_time)
+            self.loaded = True
+        if body.get("keep_alive") in (0, "0", "0s"):
+            self.loaded = False
+        context = list(body.get("context") or [])
+        prompt = body.get("prompt", "")
+        prompt_tokens = len(prompt.split())
+        base = {"model": body.get("model"), "created_at": datetime.now(timezone.utc).isoformat()}
+        tokens = [token + " " for token in self.reply.split(" ")] if prompt else []
+        for token in tokens:
+            time.sleep(self.token_delay)
+            yield dict(base, response=token, done=False)
+        yield dict(
+            base, response="", done=True, done_reason="stop",
+            context=context + list(range(len(context), len(context) + prompt_tokens + len(tokens))),
+            prompt_eval_count=prompt_tokens,
+            prompt_eval_duration=int(prompt_tokens * 1e6),
+            eval_count=len(tokens),
+            eval_duration=int(len(tokens) * self.token_delay * 1e9),
+        )
+
+
+class FakeServiceHandler(BaseHTTPRequestHandler):
+    """Route requests to the fake services attached to the server."""
+
+    calendar_path = re.compile(r"^/calendar/v3/calendars/[^/]+/events$")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if self.calendar_path.match(url.path):
+            service, handler = "calendar", self.server.calendar.list_events
+        elif url.path == "/data/2.5/weather":
+            service, handler = "weather", self.server.weather.current
+        else:
+            self.send_json(404, {"error": {"code": 404, "message": f"No fake for {url.path}"}})
+            return
+        faults = self.server.faults[service]
+        faults.delay()
+        if faults.should_fail():
+            self.send_json(500, {"error": {"code": 500, "message": f"Injected {service} failure"}})
+            return
+        status, body = handler(params)
+        self.send_json(status, faults.pad(body) if status == 200 else body)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/api/generate":
+            self.send_json(404, {"error": f"No fake for {url.path}"})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        faults = self.server.faults["ollama"]
+        faults.delay()
+        if faults.should_fail():
+            self.send_json(500, {"error": "Injected ollama failure"})
+            return
+        chunks = self.server.ollama.generate(body)
+        if not body.get("stream", True):
+            final = {}
+            text = []
+            for chunk in chunks:
+                text.append(chunk["response"])
+                final = chunk
+            self.send_json(200, dict(final, response="".join(text)))
+            return
+        # Newline-delimited JSON, one chunk per token, until the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        for chunk in chunks:
+            data = json.dumps(chunk).encode() + b"\n"
+            self.wfile.write(data)
+            self.wfile.flush()
+            self.server.bytes_sent += len(data)
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode()
+        etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 200:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.bytes_sent += len(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, calendar=None, weather=None, ollama=None, faults=None):
+    """Start a fake service server on a daemon thread and return it.
+
+    Missing services get default fakes. `faults` maps "weather",
+    "calendar" and "ollama" to Faults. `server.server_port` is the bound
+    port (useful with port=0) and `server.bytes_sent` counts response bytes.
+    """
+    server = ThreadingHTTPServer(("localhost", port), FakeServiceHandler)
+    server.daemon_threads = True
+    if calendar is None:
+        calendar = FakeCalendar()
+        calendar.seed()
+    server.calendar = calendar
+    server.weather = weather or FakeWeather()
+    server.ollama = ollama or FakeOllama()
+    server.faults = {"weather": Faults(), "calendar": Faults(), "ollama": Faults()}
+    server.faults.update(faults or {})
+    server.bytes_sent = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run local stand-ins for the mirror's services")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random extra latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 500")
+    parser.add_argument("--payload-bytes", type=int, default=0, help="padding added to weather/calendar bodies")
+    parser.add_argument("--token-delay", type=float, default=0.03, help="seconds per generated LLM token")
+    parser.add_argument("--load-time", type=float, default=2.0, help="seconds to 'load' the model when cold")
+    args = parser.parse_args()
+
+    faults = {
+        service: Faults(args.latency, args.jitter, args.error_rate, args.payload_bytes)
+        for service in ("weather", "calendar", "ollama")
+    }
+    server = start_server(
+        args.port, ollama=FakeOllama(args.token_delay, args.load_time), faults=faults,
+    )
+    base = f"http://localhost:{server.server_port}"
+    print(f"Fake services listening on {base}")
+    print(f'  config["weather"]["base_url"] = "{base}"')
+    print(f'  config["calendar"]["base_url"] = "{base}/calendar/v3/"')
+    print(f'  config["llm"]["host"] = "{base}"')
+    threading.Event().wait()
+
+
+if __name__ == "__main__":
+    main()
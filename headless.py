@@ -0,0 +1,218 @@
+# headless.py
+import heapq
+import itertools
+import threading
+import time
+
+END = "end"
+
+
+class Tk:
+    """Off-screen stand-in for tk.Tk, for running the mirror without a display.
+
+    Provides the parts of the Tk API the mirror uses (after, update,
+    mainloop, destroy and the window setup calls). after() may be called
+    from any thread; callbacks run on the thread that calls mainloop() or
+    update(), in due order. Widgets only record their options, so state()
+    reports what would be on screen and render() draws it to an image.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.timers = []
+        self.ids = itertools.count()
+        self.cancelled = set()
+        self.widgets = []
+        self.options = {}
+        self.size = (1920, 1080)
+        self.destroyed = False
+        self.callbacks_run = 0
+
+    # --- Window setup (recorded, otherwise ignored) ---
+    def title(self, text):
+        self.options["title"] = text
+
+    def attributes(self, *args):
+        self.options.update(zip(args[::2], args[1::2]))
+
+    def geometry(self, spec):
+        width, height = spec.split("+")[0].split("x")
+        self.size = (int(width), int(height))
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    config = configure
+
+    # --- Event loop ---
+    def after(self, ms, func=None, *args):
+        timer_id = f"after#{next(self.ids)}"
+        with self.cond:
+            heapq.heappush(self.timers, (time.monotonic() + ms / 1000, timer_id, func, args))
+            self.cond.notify()
+        return timer_id
+
+    def after_cancel(self, timer_id):
+        with self.cond:
+            self.cancelled.add(timer_id)
+
+    def update(self):
+        """Run every callback that is already due."""
+        while True:
+            with self.cond:
+                if not self.timers or self.timers[0][0] > time.monotonic():
+                    return
+                _, timer_id, func, args = heapq.heappop(self.timers)
+            self._call(timer_id, func, args)
+
+    def mainloop(self):
+        while True:
+            with self.cond:
+                if self.destroyed:
+                    return
+                if not self.timers:
+                    self.cond.wait()
+                    continue
+                due, timer_id, func, args = self.timers[0]
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self.cond.wait(wait)
+                    continue
+                heapq.heappop(self.timers)
+            self._call(timer_id, func, args)
+
+    def _call(self, timer_id, func, args):
+        if timer_id in self.cancelled:
+            self.cancelled.discard(timer_id)
+            return
+        try:
+            func(*args)
+        except Exception as e:
+            print(f"Error in headless callback {func}: {e}")
+        self.callbacks_run += 1
+
+    def destroy(self):
+        with self.cond:
+            self.destroyed = True
+            self.cond.notify()
+
+    # --- Output ---
+    def state(self):
+        """Return the recorded options of every placed widget, in creation order."""
+        return [widget.state() for widget in self.widgets]
+
+    def render(self, path):
+        """Draw the placed widgets' text and images to an image file at `path`."""
+        from PIL import Image, ImageDraw, ImageFont
+
+        width, height = self.size
+        image = Image.new("RGB", self.size, self.options.get("bg", "black"))
+        draw = ImageDraw.Draw(image)
+        fonts = {}
+        for widget in self.widgets:
+            if widget.geometry is None:
+                continue
+            x = int(widget.geometry.get("relx", 0) * width + widget.geometry.get("x", 0))
+            y = int(widget.geometry.get("rely", 0) * height + widget.geometry.get("y", 0))
+            picture = widget.options.get("image")
+            if picture is not None and hasattr(picture, "mode"):
+                image.paste(picture, (x, y), picture if picture.mode == "RGBA" else None)
+            text = widget.text()
+            if text:
+                family, size = widget.options.get("font", ("", 16))[:2]
+                if (family, size) not in fonts:
+                    fonts[family, size] = self._font(ImageFont, family, size)
+                if "relheight" in widget.geometry:
+                    # Like a scrolled-to-the-end widget: only the last lines that fit are visible
+                    visible = max(int(widget.geometry["relheight"] * height / (size * 1.2)), 1)
+                    text = "\n".join(text.split("\n")[-visible:])
+                draw.multiline_text((x, y), text, fill=widget.options.get("fg", "white"), font=fonts[family, size])
+        image.save(path)
+
+    @staticmethod
+    def _font(ImageFont, family, size):
+        for name in (family, family.replace(" ", "-") + ".ttf", "DejaVuSans.ttf"):
+            try:
+                return ImageFont.truetype(name, size)
+            except OSError:
+                continue
+        return ImageFont.load_default(size)
+
+
+class Widget:
+    """Records the options and geometry a Tk widget would have been given."""
+
+    def __init__(self, master, **options):
+        self.master = master
+        self.options = options
+        self.geometry = None
+        master.widgets.append(self)
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    config = configure
+
+    def cget(self, option):
+        return self.options.get(option)
+
+    def place(self, **geometry):
+        self.geometry = geometry
+
+    def after(self, ms, func=None, *args):
+        return self.master.after(ms, func, *args)
+
+    def text(self):
+        return self.options.get("text", "")
+
+    def state(self):
+        options = {key: value for key, value in self.options.items() if key != "image"}
+        options["image"] = self.options.get("image") is not None
+        return {"type": type(self).__name__, "geometry": self.geometry, "options": options, "text": self.text()}
+
+
+class Label(Widget):
+    pass
+
+
+class Text(Widget):
+    """Line buffer with the slice of the tk.Text index API Transcript uses.
+
+    Supports "1.0"-style indexes (line numbers from 1), "end" and "end-1c";
+    insert() always appends, which is all the transcript does.
+    """
+
+    def __init__(self, master, **options):
+        super().__init__(master, **options)
+        self.lines = [""]
+
+    def _line(self, index):
+        if index == END:
+            return len(self.lines) + 1
+        if index == "end-1c":
+            return len(self.lines)
+        return int(index.split(".")[0])
+
+    def index(self, index):
+        if index == "end-1c":
+            return f"{len(self.lines)}.{len(self.lines[-1])}"
+        return f"{self._line(index)}.0"
+
+    def insert(self, index, text):
+        head, *rest = text.split("\n")
+        self.lines[-1] += head
+        self.lines.extend(rest)
+
+    def get(self, start, end):
+        return "".join(line + "\n" for line in self.lines[self._line(start) - 1:self._line(end) - 1])
+
+    def delete(self, start, end):
+        del self.lines[self._line(start) - 1:self._line(end) - 1]
+        if not self.lines:
+            self.lines = [""]
+
+    def see(self, index):
+        pass
+
+    def text(self):
+        return "\n".join(self.lines)
@@ -0,0 +1,82 @@
+# http_client.py
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import metrics
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpClient:
+    """Shared HTTP client with pooled keep-alive connections.
+
+    Every request has a bounded (connect, read) timeout. Connection errors,
+    timeouts and retryable status codes are retried with exponential backoff.
+    Responses carrying an ETag or Last-Modified header are remembered, and
+    the next request for the same URL and params sends them back; a 304
+    returns the remembered body. Latency per endpoint is recorded as
+    http.<endpoint>.
+    """
+
+    def __init__(self, connect_timeout=3, read_timeout=10, retries=2, backoff=0.5, pool_size=4):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.lock = threading.Lock()
+        self.validators = {}
+
+    def get_json(self, url, params=None, endpoint=None):
+        """GET `url` and return the decoded JSON body."""
+        endpoint = endpoint or urlparse(url).path
+        key = (url, tuple(sorted((params or {}).items())))
+        with self.lock:
+            cached = self.validators.get(key)
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = self._get_with_retries(url, params, headers, endpoint)
+        if response.status_code == 304 and cached:
+            metrics.incr(f"http.{endpoint}.not_modified")
+            return cached["data"]
+        response.raise_for_status()
+        data = response.json()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            with self.lock:
+                self.validators[key] = {"etag": etag, "last_modified": last_modified, "data": data}
+        return data
+
+    def _get_with_retries(self, url, params, headers, endpoint):
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                metrics.observe(f"http.{endpoint}", time.monotonic() - started)
+                metrics.incr(f"http.{endpoint}.errors")
+                if attempt >= self.retries:
+                    raise
+            else:
+                metrics.observe(f"http.{endpoint}", time.monotonic() - started)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                metrics.incr(f"http.{endpoint}.errors")
+            metrics.incr(f"http.{endpoint}.retries")
+            # Exponential backoff with a little jitter so mirrors don't retry in lockstep
+            time.sleep(self.backoff * 2 ** attempt * random.uniform(0.8, 1.2))
+            attempt += 1
@@ -0,0 +1,75 @@
+# icons.py
+import os
+import threading
+
+from PIL import Image, ImageTk
+
+WHITE = (255, 255, 255)
+
+
+def recolor_icon(img, color=WHITE):
+    """Recolor every visible pixel of `img` to `color`, keeping its alpha.
+
+    Uses whole-image channel operations instead of a per-pixel Python loop.
+    Fully transparent pixels are left untouched, same as before.
+    """
+    img = img.convert("RGBA")
+    alpha = img.getchannel("A")
+    solid = Image.new("RGBA", img.size, color + (255,))
+    solid.putalpha(alpha)
+    visible = alpha.point(lambda a: 255 if a > 0 else 0)
+    return Image.composite(solid, img, visible)
+
+
+class IconAtlas:
+    """Decode, recolor and scale icons once and keep the results.
+
+    PIL images are cached by (icon, size, color) and can be built on any
+    thread. PhotoImage objects need the Tk thread, so they are created lazily
+    by photo() and reused from then on.
+    """
+
+    def __init__(self, icon_dir):
+        self.icon_dir = icon_dir
+        self.lock = threading.Lock()
+        self.sources = {}
+        self.images = {}
+        self.photos = {}
+
+    def _source(self, icon):
+        with self.lock:
+            img = self.sources.get(icon)
+        if img is None:
+            with Image.open(os.path.join(self.icon_dir, icon)) as f:
+                img = f.convert("RGBA")
+            with self.lock:
+                self.sources[icon] = img
+        return img
+
+    def image(self, icon, size, color=WHITE):
+        """Return the recolored, resized PIL image for `icon`."""
+        key = (icon, size, color)
+        with self.lock:
+            img = self.images.get(key)
+        if img is None:
+            img = recolor_icon(self._source(icon), color).resize(size)
+            with self.lock:
+                self.images[key] = img
+        return img
+
+    def photo(self, icon, size, color=WHITE):
+        """Return a ready PhotoImage for `icon`. Must be called on the Tk thread."""
+        key = (icon, size, color)
+        photo = self.photos.get(key)
+        if photo is None:
+            photo = ImageTk.PhotoImage(self.image(icon, size, color))
+            self.photos[key] = photo
+        return photo
+
+    def preload(self, icons, size, color=WHITE):
+        """Build the PIL images for `icons` ahead of time (safe off the Tk thread)."""
+        for icon in icons:
+            try:
+                self.image(icon, size, color)
+            except Exception as e:
+                print(f"Error preloading icon {icon}: {e}")
@@ -0,0 +1,139 @@
+# intents.py
+import re
+import time
+from datetime import date, datetime
+
+from metrics import metrics
+
+# Stripped from the ends of a prompt before matching ("hey mirry, what time is it please")
+LEADING_FILLER = re.compile(r"^(?:(?:hey|hi|ok|okay)\s+)?(?:mirry\s+)?(?:(?:can|could) you\s+)?(?:(?:please\s+)?tell me\s+)?(?:please\s+)?")
+TRAILING_FILLER = re.compile(r"(?:\s+(?:please|mirry|right now|now|today|outside|out there))*$")
+
+INTENTS = [
+    ("time", re.compile(r"what(?:s| is)? the time|what time is it|whats the time|time is it")),
+    ("date", re.compile(r"what(?:s| is)? (?:the |todays )?date|what day is (?:it|today)|whats today")),
+    ("weather", re.compile(
+        r"(?:what(?:s| is)|hows|how is) the (?:weather|temperature)(?: like)?"
+        r"|how (?:hot|cold|warm) is it|whats it like|what is it like"
+    )),
+    ("next_event", re.compile(
+        r"what(?:s| is) next(?: on my (?:calendar|schedule))?"
+        r"|what(?:s| is) my next (?:event|meeting|appointment)"
+        r"|when is my next (?:event|meeting|appointment)"
+    )),
+    ("agenda", re.compile(
+        r"what(?:s| is) on my (?:calendar|schedule|agenda)"
+        r"|what(?:s| is) my (?:schedule|agenda)"
+        r"|do i have any (?:events|meetings|appointments)"
+        r"|what do i have (?:on|coming up)"
+    )),
+]
+
+
+def normalize(prompt):
+    """Lower-case `prompt`, drop punctuation and the filler words around the question."""
+    text = re.sub(r"[^\w\s]", "", prompt.lower())
+    text = " ".join(text.split())
+    text = LEADING_FILLER.sub("", text)
+    return TRAILING_FILLER.sub("", text)
+
+
+def event_start(event):
+    start = event["start"].get("dateTime", event["start"].get("date"))
+    return datetime.fromisoformat(start)
+
+
+class IntentRouter:
+    """Answer the common time, date, weather and calendar questions without the model.
+
+    The whole (normalized) prompt has to match one of INTENTS, so anything
+    more open-ended ("should I take an umbrella?") still goes to the LLM. The
+    answers are filled in from the clock and the shared cache; when the data
+    isn't there answer() returns None and the prompt falls through as well.
+
+    Each answered intent is timed as intent.<name>; intent.fast_path and
+    intent.model count where prompts went and intent.fast_path_share is the
+    fraction answered locally.
+    """
+
+    def __init__(self, cache, time_format):
+        self.cache = cache
+        self.time_format = "%H:%M" if time_format == 24 else "%I:%M %p"
+        self.answered = 0
+        self.passed = 0
+
+    def match(self, prompt):
+        """Return the name of the intent `prompt` asks for, or None."""
+        text = normalize(prompt)
+        for name, pattern in INTENTS:
+            if pattern.fullmatch(text):
+                return name
+        return None
+
+    def answer(self, prompt):
+        """Return a templated reply for `prompt`, or None to let the model handle it."""
+        started = time.monotonic()
+        name = self.match(prompt)
+        reply = getattr(self, f"_{name}")(prompt) if name else None
+        if reply is None:
+            self.passed += 1
+            metrics.incr("intent.model")
+        else:
+            self.answered += 1
+            metrics.incr("intent.fast_path")
+            metrics.observe(f"intent.{name}", time.monotonic() - started)
+        metrics.set("intent.fast_path_share", round(self.answered / (self.answered + self.passed), 3))
+        return reply
+
+    def _format_time(self, moment):
+        # "09:30" reads as "9:30", but "00:05" has to stay "0:05"
+        return re.sub(r"^0(?=\d)", "", moment.strftime(self.time_format))
+
+    # --- Templates ---
+    def _time(self, prompt):
+        return f"It's {self._format_time(datetime.now())}."
+
+    def _date(self, prompt):
+        return f"Today is {datetime.now().strftime('%A, %B %d').replace(' 0', ' ')}."
+
+    def _weather(self, prompt):
+        weather = self.cache.get("weather")
+        if not weather:
+            return None
+        return f"It's {weather['temperature']}°C and {weather['description'].lower()} in {weather['location']}."
+
+    def _describe(self, event):
+        start = event_start(event)
+        summary = event.get("summary", "an untitled event")
+        if "dateTime" not in event["start"]:
+            when = "today" if start.date() == date.today() else start.strftime("on %A")
+            return f"{summary} {when}"
+        when = self._format_time(start)
+        if start.date() != date.today():
+            when = f"{start.strftime('%A')} at {when}"
+        else:
+            when = f"at {when}"
+        return f"{summary} {when}"
+
+    def _next_event(self, prompt):
+        events = self.cache.get("calendar")
+        if events is None:
+            return None
+        if not events:
+            return "You have nothing coming up on your calendar."
+        return f"Your next event is {self._describe(events[0])}."
+
+    def _agenda(self, prompt):
+        events = self.cache.get("calendar")
+        if events is None:
+            return None
+        if "today" in prompt.lower():
+            events = [event for event in events if event_start(event).date() == date.today()]
+            if not events:
+                return "You have nothing else on your calendar today."
+        if not events:
+            return "You have nothing coming up on your calendar."
+        described = [self._describe(event) for event in events]
+        if len(described) == 1:
+            return f"You have one event coming up: {described[0]}."
+        return f"You have {len(described)} events coming up: {', '.join(described[:-1])} and {described[-1]}."
@@ -0,0 +1,277 @@
+# llm.py
+import math
+import re
+import threading
+import time
+from collections import deque
+
+from metrics import metrics
+
+# A sentence ends at . ! or ? (optionally followed by closing quotes/brackets) and then whitespace
+SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+
+
+class SentenceChunker:
+    """Collect streamed tokens and hand back complete sentences."""
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, token):
+        """Add a token and return any sentences it completed."""
+        self.buffer += token
+        sentences = []
+        while True:
+            match = SENTENCE_END.search(self.buffer)
+            if not match:
+                break
+            sentences.append(self.buffer[:match.end()].strip())
+            self.buffer = self.buffer[match.end():]
+        return sentences
+
+    def flush(self):
+        """Return whatever is left once the stream has ended."""
+        rest, self.buffer = self.buffer.strip(), ""
+        return rest
+
+
+def estimate_tokens(text):
+    """Rough token count for budgeting (about four characters per token for English)."""
+    return math.ceil(len(text) / 4)
+
+
+def shorten(text, limit):
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+class ConversationMemory:
+    """Recent conversation turns kept within a token budget, with older turns summarized.
+
+    Turns are kept verbatim while they fit in `budget_tokens`. Once they
+    don't, the oldest turns are compacted into one-line notes (the question
+    and the first sentence of the answer) that make up the summary, and the
+    summary itself is trimmed to `summary_tokens` by dropping its oldest
+    notes. Memory use and the size of render() stay bounded however long
+    the conversation runs.
+
+    Gauges: memory.turns, memory.tokens and memory.summary_tokens; compacted
+    turns are counted as memory.compactions.
+    """
+
+    def __init__(self, budget_tokens=1024, summary_tokens=256):
+        self.budget_tokens = budget_tokens
+        self.summary_tokens = summary_tokens
+        self.lock = threading.Lock()
+        self.turns = deque()
+        self.tokens = 0
+        self.summary = deque()
+        self.summary_size = 0
+
+    def add(self, user, reply):
+        turn = (f"User: {user.strip()}\nMirry: {reply.strip()}\n", user, reply)
+        with self.lock:
+            self.turns.append(turn)
+            self.tokens += estimate_tokens(turn[0])
+            # Always keep the latest turn verbatim, even if it alone is over budget
+            while self.tokens > self.budget_tokens and len(self.turns) > 1:
+                self._compact(self.turns.popleft())
+            metrics.set("memory.turns", len(self.turns))
+            metrics.set("memory.tokens", self.tokens)
+            metrics.set("memory.summary_tokens", self.summary_size)
+
+    def _compact(self, turn):
+        text, user, reply = turn
+        self.tokens -= estimate_tokens(text)
+        match = SENTENCE_END.search(reply + " ")
+        first_sentence = reply[:match.end()] if match else reply
+        note = f"- Asked \"{shorten(user, 80)}\"; answered: {shorten(first_sentence, 120)}\n"
+        self.summary.append(note)
+        self.summary_size += estimate_tokens(note)
+        while self.summary_size > self.summary_tokens and len(self.summary) > 1:
+            self.summary_size -= estimate_tokens(self.summary.popleft())
+        metrics.incr("memory.compactions")
+
+    def render(self):
+        """The summary and recent turns, formatted for the prompt ("" when empty)."""
+        with self.lock:
+            parts = []
+            if self.summary:
+                parts.append("Earlier in this conversation:\n" + "".join(self.summary))
+            if self.turns:
+                parts.append("Recent conversation:\n" + "".join(text for text, _, _ in self.turns))
+        return "".join(f"{part}\n" for part in parts)
+
+    def clear(self):
+        with self.lock:
+            self.turns.clear()
+            self.summary.clear()
+            self.tokens = self.summary_size = 0
+
+
+class ModelSession:
+    """Keep an Ollama model resident and carry its context from turn to turn.
+
+    warm_up() loads the model ahead of the first prompt, and every request
+    passes `keep_alive` so Ollama doesn't unload it between turns. With
+    `reuse_context` on, the `context` returned by each generation is sent
+    with the next one, and a context section (weather, calendar, ...) is left
+    out of the new prompt when the model's latest copy of it is unchanged,
+    instead of being evaluated again. The context is dropped once it grows past
+    `max_context_tokens`.
+
+    With a ConversationMemory attached, every finished turn is recorded
+    with record_turn(). Whenever no context is being carried (reuse_context
+    off, or right after a reset) the prompt includes the memory's summary
+    and recent turns, so follow-up questions keep their footing within a
+    bounded prompt. Turns answered without the model (generated=False)
+    aren't in a carried context, so those recorded since the last
+    generation are added to the next prompt either way. Prompt tokens of the last turn are published as the
+    llm.last_prompt_tokens gauge.
+    """
+
+    def __init__(self, client, model, config, memory=None):
+        self.client = client
+        self.model = model
+        self.keep_alive = config["keep_alive"]
+        self.reuse_context = config["reuse_context"]
+        self.max_context_tokens = config["max_context_tokens"]
+        self.memory = memory
+        # Prompt tokens evaluated for each recent generation, oldest first
+        self.prompt_token_history = deque(maxlen=100)
+        self.lock = threading.Lock()
+        self.context = None
+        # Last copy of each section (by position) that the carried context holds
+        self.sent_sections = {}
+        self.pending_sections = {}
+        # Turns the carried context hasn't seen (answered locally), oldest first
+        self.unseen_turns = deque(maxlen=10)
+        self.pending_turns = 0
+
+    def warm_up(self):
+        """Load the model into memory (an empty prompt only loads it)."""
+        started = time.monotonic()
+        try:
+            self.client.generate(model=self.model, prompt="", keep_alive=self.keep_alive)
+        except Exception as e:
+            print(f"Error warming up {self.model}: {e}")
+            return
+        metrics.observe("llm.warm_up", time.monotonic() - started)
+
+    def build_prompt(self, sections, prompt):
+        """Join the context sections and the user prompt, skipping sections the model already has."""
+        with self.lock:
+            carried = self.reuse_context and self.context
+            # Sections always come in the same order (time, weather, calendar), so a
+            # position stands for one kind; only skip it if the model's latest copy matches
+            latest = dict(enumerate(sections))
+            if carried:
+                sections = [section for i, section in latest.items() if self.sent_sections.get(i) != section]
+            self.pending_sections = latest
+            unseen = list(self.unseen_turns)
+            self.pending_turns = len(unseen)
+        context = "".join(f"{section}\n" for section in sections)
+        # The carried context already holds the conversation, apart from turns answered
+        # without the model; otherwise replay it all from memory
+        if self.memory is not None and not carried:
+            history = self.memory.render()
+        else:
+            history = "Since your last reply:\n" + "".join(unseen) if unseen else ""
+        return f"{context}\n{history}User Prompt: {prompt}"
+
+    def record_turn(self, prompt, reply, generated=True):
+        """Remember a finished exchange; pass generated=False for one answered without the model."""
+        if not reply:
+            return
+        if self.memory is not None:
+            self.memory.add(prompt, reply)
+        if not generated:
+            with self.lock:
+                if self.reuse_context and self.context:
+                    self.unseen_turns.append(f"User: {prompt.strip()}\nMirry: {reply.strip()}\n")
+
+    def generate(self, prompt, stream=False):
+        """Run a generation with keep_alive and the carried context applied."""
+        kwargs = {"model": self.model, "prompt": prompt, "keep_alive": self.keep_alive, "stream": stream}
+        with self.lock:
+            if self.reuse_context and self.context:
+                kwargs["context"] = self.context
+        response = self.client.generate(**kwargs)
+        if not stream:
+            self._remember(response)
+            return response
+        return self._track(response)
+
+    def _track(self, stream):
+        try:
+            for chunk in stream:
+                if chunk.done:
+                    self._remember(chunk)
+                yield chunk
+        finally:
+            stream.close()
+
+    def _remember(self, response):
+        metrics.observe("llm.prompt_eval", (response.prompt_eval_duration or 0) / 1e9)
+        metrics.incr("llm.prompt_tokens", response.prompt_eval_count or 0)
+        metrics.set("llm.last_prompt_tokens", response.prompt_eval_count or 0)
+        self.prompt_token_history.append(response.prompt_eval_count or 0)
+        metrics.set("llm.context_tokens", len(response.context or []))
+        if not self.reuse_context:
+            return
+        with self.lock:
+            self.context = response.context
+            self.sent_sections.update(self.pending_sections)
+            # The turns included in this prompt are part of the context now
+            for _ in range(min(self.pending_turns, len(self.unseen_turns))):
+                self.unseen_turns.popleft()
+            self.pending_turns = 0
+            if self.context and len(self.context) > self.max_context_tokens:
+                self.reset()
+
+    def reset(self):
+        """Forget the carried context; the next prompt includes every section again."""
+        self.context = None
+        self.sent_sections = {}
+        self.pending_sections = {}
+        # Memory replays them (or, without memory, they go with the next prompt)
+        if self.memory is not None:
+            self.unseen_turns.clear()
+        self.pending_turns = 0
+
+
+def stream_reply(session, prompt, on_token, on_sentence, cancelled=lambda: False):
+    """Stream a completion, passing each token and each finished sentence on as it arrives.
+
+    Returns the full reply text, or what was generated so far if `cancelled()`
+    turns true mid-stream (closing the stream stops the generation). Time to
+    the first token and to the first complete sentence are recorded as
+    llm.time_to_first_token and llm.time_to_first_sentence.
+    """
+    started = time.monotonic()
+    chunker = SentenceChunker()
+    reply = []
+    first_sentence = True
+    stream = session.generate(prompt, stream=True)
+    for chunk in stream:
+        if cancelled():
+            metrics.incr("llm.cancelled")
+            stream.close()
+            return "".join(reply)
+        token = chunk.response
+        if not token:
+            continue
+        if not reply:
+            metrics.observe("llm.time_to_first_token", time.monotonic() - started)
+        reply.append(token)
+        on_token(token)
+        for sentence in chunker.feed(token):
+            if first_sentence:
+                metrics.observe("llm.time_to_first_sentence", time.monotonic() - started)
+                first_sentence = False
+            on_sentence(sentence)
+    rest = chunker.flush()
+    if rest:
+        on_sentence(rest)
+    metrics.observe("llm.generate", time.monotonic() - started)
+    return "".join(reply)
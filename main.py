@@ -1,27 +1,39 @@
+import time
+startup_started = time.monotonic()
+
 import tkinter as tk
 from datetime import datetime
-import requests
 from config import get_config
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
+import atexit
 import os
-import pickle
-import pytz
-from PIL import Image, ImageTk, ImageOps
-
-import ollama
-import speech_recognition as sr
-import pyttsx3
 import threading
 
+# Only what the first frame needs is imported here. PIL, requests, the Google
+# client libraries, ollama, the speech engines and the asyncio I/O engine are
+# imported by the code that uses them, after the first frame (see the
+# function-level imports below).
+from cache import DataCache
+from clock import Clock
+from metrics import StartupTimer, metrics
+from transcript import Transcript
+from ui_dispatch import UIDispatcher
+
+startup = StartupTimer(startup_started)
+
 # --- Global Constants ---
-SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
 modelname = "MirrorAssistant1.0"  # Name of your Ollama model
 
 # Path to the Google Calendar credentials JSON file
 credentials_file = r"C:\Users\omarb\OneDrive\Documents\Credentials\googlecal_credentials.json"  
 
+# Recolored, resized weather icons are cached here and reused across refreshes
+weather_icon_dir = os.path.join(os.path.dirname(__file__), "weather_icons")
+weather_icon_size = (70, 70)
+icon_atlas = None
+icon_atlas_lock = threading.Lock()
+# Set by main() when running on the off-screen backend (see headless.py)
+headless_display = False
+
 # Mapping for weather icons based on description
 weather_icon_map = {
     # Thunderstorm group
@@ -93,51 +105,22 @@ weather_icon_map = {
 }
 
 # --- Google Calendar Functions ---
-def authenticate_google_calendar():
-    """Authenticate with Google Calendar API."""
-    creds = None
-    if os.path.exists('token.pickle'):
-        with open('token.pickle', 'rb') as token:
-            creds = pickle.load(token)
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(credentials_file, SCOPES) 
-            creds = flow.run_local_server(port=0)
-        with open('token.pickle', 'wb') as token:
-            pickle.dump(creds, token)
-    return creds
-
-def fetch_calendar_events():
+def fetch_calendar_events(calendar):
     """Fetch upcoming events from Google Calendar."""
     try:
-        creds = authenticate_google_calendar()
-        service = build('calendar', 'v3', credentials=creds)
-        eastern_tz = pytz.timezone("America/New_York")
-        now_eastern = datetime.now(eastern_tz)
-        now_utc = now_eastern.astimezone(pytz.utc)
-        now = now_utc.isoformat()
-        events_result = service.events().list(
-            calendarId='primary', timeMin=now,
-            maxResults=5, singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        events = events_result.get('items', [])
-        return events
+        return calendar.upcoming_events()
     except Exception as e:
         print(f"Error fetching calendar events: {e}")
-        return []
+        # None keeps the last good events in the cache instead of blanking them
+        return None
 
 # --- Weather Functions ---
-def fetch_weather(api_key, lat, lon, units):
+def fetch_weather(http, base_url, api_key, lat, lon, units):
     """Fetch weather data from OpenWeatherMap API."""
     try:
-        url = "http://api.openweathermap.org/data/2.5/weather"
+        url = f"{base_url}/data/2.5/weather"
         params = {"lat": lat, "lon": lon, "units": units, "appid": api_key}
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = http.get_json(url, params=params, endpoint="weather")
         weather = {
             "temperature": round(data["main"]["temp"]),
             "description": data["weather"][0]["description"].capitalize(),
@@ -148,36 +131,24 @@ def fetch_weather(api_key, lat, lon, units):
         print(f"Error fetching weather: {e}")
         return None
 
-def update_time_with_date(time_label, date_label, time_format):
-    """Update the time and date displayed on the labels."""
-    now = datetime.now()
-    time_string = now.strftime("%H:%M" if time_format == 24 else "%I:%M %p")
-    date_string = now.strftime("%A, %B %d")
-    time_label.config(text=time_string)
-    date_label.config(text=date_string)
-    time_label.after(1000, update_time_with_date, time_label, date_label, time_format)
+def get_icon_atlas():
+    """Create the icon atlas on first use (this is what imports PIL)."""
+    global icon_atlas
+    with icon_atlas_lock:
+        if icon_atlas is None:
+            from icons import IconAtlas
+            icon_atlas = IconAtlas(weather_icon_dir)
+    return icon_atlas
 
 def recolor_icon_to_white(icon_path):
     """Recolor the icon to white for better visibility on black background."""
-    img = Image.open(icon_path).convert("RGBA")
-    data = img.getdata()
-    new_data = []
-    for item in data:
-        if item[3] > 0:
-            new_data.append((255, 255, 255, item[3]))
-        else:
-            new_data.append(item)
-    img.putdata(new_data)
-    return img
-
-def update_weather(weather_label, weather_icon_label, description_label, config):
-    """Fetch and update weather data and icon on the label."""
-    weather = fetch_weather(
-        config["weather"]["api_key"],
-        config["weather"]["lat"],
-        config["weather"]["lon"],
-        config["weather"].get("units", "metric")
-    )
+    from PIL import Image
+    from icons import recolor_icon
+    with Image.open(icon_path) as img:
+        return recolor_icon(img)
+
+def update_weather(weather_label, weather_icon_label, description_label, weather):
+    """Update the weather labels and icon from already-fetched weather data."""
     if weather:
         location = weather["location"]
         temperature = f"{weather['temperature']}°C"
@@ -187,10 +158,11 @@ def update_weather(weather_label, weather_icon_label, description_label, config)
         description_key = weather["description"].lower()
         icon_filename = weather_icon_map.get(description_key, "default_sun.png")
         try:
-            icon_path = os.path.join(os.path.dirname(__file__), "weather_icons", icon_filename)
-            img = recolor_icon_to_white(icon_path)
-            img = img.resize((70, 70))
-            icon = ImageTk.PhotoImage(img)
+            # PhotoImage needs a real Tk interpreter; the headless labels just keep the PIL image
+            if headless_display:
+                icon = get_icon_atlas().image(icon_filename, weather_icon_size)
+            else:
+                icon = get_icon_atlas().photo(icon_filename, weather_icon_size)
             weather_icon_label.config(image=icon)
             weather_icon_label.image = icon
         except Exception as e:
@@ -198,11 +170,9 @@ def update_weather(weather_label, weather_icon_label, description_label, config)
     else:
         weather_label.config(text="Weather data unavailable")
         description_label.config(text="")
-    weather_label.after(600000, update_weather, weather_label, weather_icon_label, description_label, config)
 
-def update_calendar(calendar_label):
-    """Fetch and update calendar events on the label."""
-    events = fetch_calendar_events()
+def update_calendar(calendar_label, events):
+    """Update the calendar label from already-fetched events."""
     if events:
         calendar_text = "Upcoming Events:\n"
         for event in events:
@@ -212,26 +182,111 @@ def update_calendar(calendar_label):
     else:
         calendar_text = "No upcoming events found."
     calendar_label.config(text=calendar_text)
-    calendar_label.after(600000, update_calendar, calendar_label)
+
+def build_data_cache(config):
+    """Create the shared weather/calendar cache used by the display and the LLM.
+
+    The HTTP and Calendar clients are created by the first fetch, on a
+    worker thread, so neither their imports nor OAuth delay the first frame.
+    """
+    cache = DataCache()
+    clients = {}
+    clients_lock = threading.Lock()
+
+    def http():
+        with clients_lock:
+            if "http" not in clients:
+                from http_client import HttpClient
+                clients["http"] = HttpClient(**config["http"])
+            return clients["http"]
+
+    def calendar():
+        with clients_lock:
+            if "calendar" not in clients:
+                from calendar_client import CalendarClient
+                clients["calendar"] = CalendarClient(
+                    credentials_file,
+                    max_results=config["calendar"]["max_results"],
+                    refresh_margin=config["calendar"]["refresh_margin"],
+                    horizon_days=config["calendar"]["horizon_days"],
+                    base_url=config["calendar"]["base_url"],
+                )
+            return clients["calendar"]
+
+    cache.register(
+        "weather",
+        lambda: fetch_weather(
+            http(),
+            config["weather"]["base_url"],
+            config["weather"]["api_key"],
+            config["weather"]["lat"],
+            config["weather"]["lon"],
+            config["weather"].get("units", "metric"),
+        ),
+        ttl=config["cache"]["weather_ttl"],
+        error_ttl=config["cache"]["error_ttl"],
+    )
+    cache.register(
+        "calendar",
+        lambda: fetch_calendar_events(calendar()),
+        ttl=config["cache"]["calendar_ttl"],
+        error_ttl=config["cache"]["error_ttl"],
+    )
+    return cache
+
+def start_background_fetches(root, engine, bridge, config, cache, weather_labels, calendar_label):
+    """Schedule weather and calendar refreshes on the I/O engine.
+
+    Network I/O never runs on the Tk thread; only the finished results are
+    handed back to update_weather/update_calendar through the Tk bridge.
+    """
+    from scheduler import FetchScheduler, UILagMonitor
+    sched_config = config["scheduler"]
+    scheduler = FetchScheduler(engine, bridge)
+    weather_config = sched_config["weather"]
+    scheduler.add_source(
+        "weather",
+        lambda: cache.refresh("weather"),
+        lambda weather: update_weather(*weather_labels, weather),
+        interval=weather_config["interval"],
+        jitter=weather_config["jitter"],
+        timeout=weather_config["timeout"],
+    )
+    calendar_config = sched_config["calendar"]
+    scheduler.add_source(
+        "calendar",
+        lambda: cache.refresh("calendar"),
+        lambda events: update_calendar(calendar_label, events),
+        interval=calendar_config["interval"],
+        jitter=calendar_config["jitter"],
+        timeout=calendar_config["timeout"],
+    )
+    if config["ui"]["lag_check_ms"]:
+        UILagMonitor(root, interval_ms=config["ui"]["lag_check_ms"])
+    # Decode and recolor the icon set up front so the first refresh only wraps a PhotoImage.
+    # The atlas itself is created in the worker too, so PIL is never imported on the Tk thread.
+    engine.submit(engine.run_blocking(
+        lambda: get_icon_atlas().preload(sorted(set(weather_icon_map.values())), weather_icon_size),
+    ))
+    return scheduler
 
 # --- Prompt Augmentation Functions ---
-def get_api_context(config):
-    """Fetch API data and format it for prompt augmentation, including current time."""
+def get_api_context(cache):
+    """Format cached API data for prompt augmentation, including current time.
+
+    Returns the time, weather and calendar sections separately so the model
+    session can leave out the ones it has already seen.
+    """
     current_time = datetime.now().strftime('%I:%M %p, %A, %B %d, %Y')
     time_info = f"Current Time: {current_time}."
     
-    weather = fetch_weather(
-        config["weather"]["api_key"],
-        config["weather"]["lat"],
-        config["weather"]["lon"],
-        config["weather"].get("units", "metric")
-    )
+    weather = cache.get("weather")
     if weather:
         weather_info = f"Weather: {weather['location']}, {weather['temperature']}°C, {weather['description']}."
     else:
         weather_info = "Weather data unavailable."
     
-    events = fetch_calendar_events()
+    events = cache.get("calendar")
     if events:
         calendar_info = "Upcoming Events:\n"
         for event in events:
@@ -241,55 +296,126 @@ def get_api_context(config):
     else:
         calendar_info = "No upcoming events found."
         
-    context = f"{time_info}\n{weather_info}\n{calendar_info}\n"
-    return context
+    return [time_info, weather_info, calendar_info]
+
+# --- Status Server Functions ---
+def get_display_state(clock, cache, transcript, transcript_lines):
+    """Snapshot of what the mirror is showing, read without touching Tk."""
+    events = cache.peek("calendar") or []
+    return {
+        "time": clock.time_text,
+        "date": clock.date_text,
+        "weather": cache.peek("weather"),
+        "calendar": [
+            {"start": event["start"].get("dateTime", event["start"].get("date")), "summary": event.get("summary", "No Title")}
+            for event in events
+        ],
+        "transcript": transcript.recent(transcript_lines),
+    }
+
+def get_status_metrics(clock, cache):
+    """Fetch latencies, cache ages, pipeline timings and other counters."""
+    snapshot = metrics.snapshot()
+    snapshot["cache"] = cache.stats()
+    snapshot["clock"] = clock.stats()
+    return snapshot
+
+def start_status_server(engine, config, clock, cache, transcript):
+    """Serve /status and /metrics on the configured address and port, on the I/O engine."""
+    from status_server import StatusServer
+    server = StatusServer(
+        config["address"],
+        config["port"],
+        status=lambda: get_display_state(clock, cache, transcript, config["status_server"]["transcript_lines"]),
+        stats=lambda: get_status_metrics(clock, cache),
+    )
+    engine.submit(server.serve())
+    return server
 
 # --- LLM Conversation Functions ---
-def update_text_widget(widget, text):
-    """Thread-safe update of the text widget."""
-    def inner():
-        widget.insert(tk.END, text)
-        widget.see(tk.END)
-    widget.after(0, inner)
-
-def llm_conversation_thread(llm_text_widget, config):
-    client = ollama.Client()
+
+def llm_conversation_thread(engine, dispatcher, transcript, config, cache):
+    import contextlib
+    import ollama
+    import speech_recognition as sr
+    from llm import ConversationMemory, ModelSession
+    from intents import IntentRouter
+    from microphone import AmbientNoiseMonitor, VoiceOnsetDetector
+    from pipeline import ConversationPipeline
+    from stt import SpeechToText
+    from tts import SpeechQueue, make_engine_factory
+
+    memory = None
+    if config["memory"]["enabled"]:
+        memory = ConversationMemory(config["memory"]["budget_tokens"], config["memory"]["summary_tokens"])
+    session = ModelSession(ollama.Client(host=config["llm"]["host"]), modelname, config["llm"], memory=memory)
+    # Load the model while the microphone calibrates so the first reply doesn't pay for it
+    engine.submit(engine.run_blocking(session.warm_up))
     recognizer = sr.Recognizer()
-    tts_engine = pyttsx3.init()
+    if config["speech_workers"]["enabled"]:
+        # Recognition and synthesis run in supervised child processes, off this process's GIL
+        from speech_workers import ProcessSpeechEngine, ProcessSTT
+        stt = ProcessSTT(config)
+        tts_engine = ProcessSpeechEngine(config)
+        speech = SpeechQueue(lambda: tts_engine)
+        # Ask the workers to exit when the app does instead of leaving them to be terminated
+        atexit.register(stt.close)
+        atexit.register(tts_engine.close)
+    else:
+        stt = SpeechToText(recognizer, config["stt"])
+        speech = SpeechQueue(make_engine_factory(config["tts"]))
+    router = IntentRouter(cache, config["time_format"]) if config["conversation"]["fast_path"] else None
     
-    while True:
+    # Keep one microphone stream open for the whole conversation and calibrate it once
+    with contextlib.ExitStack() as stack:
         try:
-            with sr.Microphone() as source:
-                recognizer.adjust_for_ambient_noise(source, duration=2)
-                update_text_widget(llm_text_widget, "\nListening for your prompt...")
-                audio_data = recognizer.listen(source, timeout=None, phrase_time_limit=60)
-            prompt = recognizer.recognize_google(audio_data).strip()
-            update_text_widget(llm_text_widget, f"\nYou said: {prompt}")
-            if prompt.lower() in ["stop", "exit"]:
-                update_text_widget(llm_text_widget, "\nExiting Conversation.\n")
-                break
-            # Get API context and build the augmented prompt
-            api_context = get_api_context(config)
-            augmented_prompt = f"{api_context}\nUser Prompt: {prompt}"
-            # (Augmented prompt is used for the LLM call but not shown in the text widget)
-            response = client.generate(model=modelname, prompt=augmented_prompt)
-            model_reply = response.response
-            update_text_widget(llm_text_widget, f"\nAssistant Response: {model_reply}\n")
-            tts_engine.say(model_reply)
-            tts_engine.runAndWait()
-        except sr.UnknownValueError:
-            update_text_widget(llm_text_widget, "\nCould not understand audio. Please try again.\n")
-        except sr.RequestError as e:
-            update_text_widget(llm_text_widget, f"\nSpeech service error: {e}\n")
-        except Exception as e:
-            update_text_widget(llm_text_widget, f"\nError: {e}\n")
+            source = stack.enter_context(sr.Microphone(device_index=config["microphone"]["device_index"]))
+        except (AttributeError, OSError) as e:
+            # No PyAudio or no input device (a server or CI box): the rest of the mirror keeps running
+            print(f"Voice conversation disabled, no microphone available: {e}")
+            dispatcher.append(transcript, f"Voice conversation is off: no microphone available ({e}).\n")
+            return
+        noise_monitor = AmbientNoiseMonitor(recognizer, source, config["microphone"])
+        noise_monitor.calibrate()
+        pipeline = ConversationPipeline(
+            recognizer, source, noise_monitor, stt, session, speech, config,
+            build_context=lambda: get_api_context(cache),
+            show=lambda text: dispatcher.append(transcript, text),
+            router=router,
+            spawn=engine.spawner(timeout=config["cache"]["refresh_timeout"]),
+        )
+        # Start fetching the prompt context the moment speech starts, not after transcription
+        VoiceOnsetDetector(recognizer, source, pipeline.on_voice_onset)
+        startup.mark("ready_to_listen")
+        print(startup.report())
+        pipeline.run()
 
 
 # --- Main GUI Setup ---
-def main():
+def main(headless_mode=False, run_for=None, render_path=None):
+    """Run the mirror.
+
+    With `headless_mode` the widgets come from headless.py instead of
+    tkinter, so everything (clock, fetches, conversation) runs without a
+    display. `run_for` stops the main loop after that many seconds and
+    `render_path` saves an image of the off-screen display when it stops.
+    """
+    global headless_display
+    headless_display = headless_mode
+    if render_path and not headless_display:
+        raise ValueError("render_path needs headless mode")
+    ui = tk
+    if headless_display:
+        import headless as ui
     config = get_config()
-
-    root = tk.Tk()
+    metrics.window = config["metrics"]["window"]
+    if config["metrics"]["dump_path"]:
+        # Pipeline timings, fetch latencies and counters are written out when the app exits
+        atexit.register(metrics.dump, config["metrics"]["dump_path"])
+    cache = build_data_cache(config)
+    startup.mark("imports")
+
+    root = ui.Tk()
     root.title("Smart Display with LLM")
     root.attributes("-fullscreen", True)
     root.geometry("1920x1080")
@@ -301,38 +427,68 @@ def main():
     roboto_medium = ("Roboto Light", 32)
 
     # --- Top Right Section: Time, Date, Weather, and Calendar ---
-    time_label = tk.Label(root, text="", font=roboto_large, fg="white", bg="black", anchor="e", justify="right")
+    time_label = ui.Label(root, text="", font=roboto_large, fg="white", bg="black", anchor="e", justify="right")
     time_label.place(relx=0.7, rely=0.02)
     
-    date_label = tk.Label(root, text="", font=roboto_light, fg="white", bg="black", anchor="e", justify="right")
+    date_label = ui.Label(root, text="", font=roboto_light, fg="white", bg="black", anchor="e", justify="right")
     date_label.place(relx=0.7, rely=0.1)
-    update_time_with_date(time_label, date_label, config["time_format"])
+    clock = Clock(time_label, date_label, config["time_format"], resync=config["clock"]["resync"])
+    clock.tick()
 
-    weather_label = tk.Label(root, text="Loading weather...", font=roboto_medium, fg="white", bg="black", anchor="w", justify="left")
+    weather_label = ui.Label(root, text="Loading weather...", font=roboto_medium, fg="white", bg="black", anchor="w", justify="left")
     weather_label.place(relx=0.7, rely=0.18)
     
-    weather_icon_label = tk.Label(root, bg="black")
+    weather_icon_label = ui.Label(root, bg="black")
     weather_icon_label.place(relx=0.9, rely=0.18)
     
-    description_label = tk.Label(root, text="", font=roboto_light, fg="white", bg="black", anchor="w", justify="left")
+    description_label = ui.Label(root, text="", font=roboto_light, fg="white", bg="black", anchor="w", justify="left")
     description_label.place(relx=0.7, rely=0.27)
-    update_weather(weather_label, weather_icon_label, description_label, config)
 
-    calendar_label = tk.Label(root, text="Loading calendar...", font=roboto_light, fg="white", bg="black", anchor="w", justify="left")
+    calendar_label = ui.Label(root, text="Loading calendar...", font=roboto_light, fg="white", bg="black", anchor="w", justify="left")
     calendar_label.place(relx=0.7, rely=0.35, relwidth=0.25, relheight=0.2)
-    update_calendar(calendar_label)
 
     # --- Left Section: LLM Conversation Widget ---
     # Increased the font size for better readability
-    llm_text_widget = tk.Text(root, font=("Roboto Light", 32), fg="white", bg="black", wrap="word")
+    llm_text_widget = ui.Text(root, font=("Roboto Light", 32), fg="white", bg="black", wrap="word")
     llm_text_widget.place(relx=0.02, rely=0.02, relwidth=0.46, relheight=0.96)
-
-    # Start the LLM conversation thread (pass config as argument)
-    threading.Thread(target=llm_conversation_thread, args=(llm_text_widget, config), daemon=True).start()
-
+    # Only the last few hundred lines stay in the widget; older ones can be spilled to disk
+    transcript = Transcript(llm_text_widget, **config["transcript"])
+    # Worker threads push text through the dispatcher, which batches it into capped-rate redraws
+    dispatcher = UIDispatcher(root, max_hz=config["ui"]["max_hz"])
+
+    # Paint the first frame (clock and placeholders) before any network, auth or model work starts
+    root.update()
+    startup.mark("first_paint")
+
+    # One event loop thread owns the network I/O from here on; results come back through the bridge
+    from engine import AsyncEngine, TkBridge
+    engine = AsyncEngine(workers=config["scheduler"]["workers"]).start()
+    bridge = TkBridge(root)
+    # Stale-cache revalidation runs on the engine too, with a timeout and cancelled at shutdown
+    cache.spawn = engine.spawner(timeout=config["cache"]["refresh_timeout"])
+    start_background_fetches(root, engine, bridge, config, cache, (weather_label, weather_icon_label, description_label), calendar_label)
+    if config["status_server"]["enabled"]:
+        start_status_server(engine, config, clock, cache, transcript)
+    # Start the LLM conversation thread (pass config and the shared cache as arguments)
+    threading.Thread(target=llm_conversation_thread, args=(engine, dispatcher, transcript, config, cache), daemon=True).start()
+
+    if run_for is not None:
+        root.after(int(run_for * 1000), root.destroy)
     root.mainloop()
+    engine.shutdown()
+    # Flush and close the spill file, if there is one
+    transcript.close()
+    if render_path:
+        root.render(render_path)
+    return root
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Smart mirror with a local LLM assistant")
+    parser.add_argument("--headless", action="store_true", help="run on the off-screen backend (no display needed)")
+    parser.add_argument("--run-for", type=float, help="exit after this many seconds")
+    parser.add_argument("--render", metavar="PATH", help="with --headless, save an image of the display on exit")
+    args = parser.parse_args()
+    main(args.headless, args.run_for, args.render)
 
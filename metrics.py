@@ -0,0 +1,112 @@
+# metrics.py
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class LatencyStats:
+    """Keep a running summary of latency samples (in seconds).
+
+    Count, mean and max cover every sample; the percentiles come from a
+    rolling window of the most recent `window` samples.
+    """
+
+    def __init__(self, window=512):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, ordered, pct):
+        return ordered[min(int(pct / 100 * len(ordered)), len(ordered) - 1)]
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 2),
+            "p50_ms": round(self.percentile(ordered, 50) * 1000, 2),
+            "p95_ms": round(self.percentile(ordered, 95) * 1000, 2),
+            "p99_ms": round(self.percentile(ordered, 99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+            "last_ms": round(self.samples[-1] * 1000, 2),
+        }
+
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and latency stats."""
+
+    def __init__(self, window=512):
+        self.window = window
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.latencies = {}
+
+    def incr(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+
+    def observe(self, name, seconds):
+        with self.lock:
+            if name not in self.latencies:
+                self.latencies[name] = LatencyStats(self.window)
+            self.latencies[name].record(seconds)
+
+    @contextmanager
+    def span(self, name):
+        """Time the body of a with-block and record it under `name`."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - started)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "latencies": {name: stats.summary() for name, stats in self.latencies.items()},
+            }
+
+    def dump(self, path):
+        """Write a snapshot to `path` as JSON."""
+        try:
+            with open(path, "w") as f:
+                json.dump(self.snapshot(), f, indent=4, sort_keys=True)
+        except OSError as e:
+            print(f"Error writing metrics to {path}: {e}")
+
+
+class StartupTimer:
+    """Record when each startup stage was reached, relative to process start."""
+
+    def __init__(self, started):
+        self.started = started
+        self.marks = {}
+
+    def mark(self, stage):
+        elapsed = time.monotonic() - self.started
+        self.marks[stage] = elapsed
+        metrics.set(f"startup.{stage}_ms", round(elapsed * 1000, 1))
+
+    def report(self):
+        return "Startup: " + ", ".join(f"{stage} {elapsed * 1000:.0f} ms" for stage, elapsed in self.marks.items())
+
+
+metrics = Metrics()
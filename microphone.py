@@ -0,0 +1,100 @@
+# microphone.py
+import audioop
+import time
+
+from metrics import metrics
+
+
+class AmbientNoiseMonitor:
+    """Track the noise floor of an open microphone and recalibrate only on drift.
+
+    A full calibration (the old per-turn adjust_for_ambient_noise) runs once at
+    startup. Before each turn a short probe updates a smoothed noise-floor
+    estimate, and the full calibration only runs again if that estimate has
+    moved by more than `drift_ratio` from the calibrated floor.
+    """
+
+    def __init__(self, recognizer, source, config):
+        self.recognizer = recognizer
+        self.source = source
+        self.calibration_duration = config["calibration_duration"]
+        self.probe_duration = config["probe_duration"]
+        self.drift_ratio = config["drift_ratio"]
+        self.smoothing = config["smoothing"]
+        self.calibrated_floor = None
+        self.floor = None
+
+    def _flush(self):
+        """Drop audio buffered while nobody was reading (e.g. our own TTS playback)."""
+        stream = getattr(self.source.stream, "pyaudio_stream", None)
+        if stream is not None:
+            available = stream.get_read_available()
+            if available:
+                stream.read(available, exception_on_overflow=False)
+
+    def _measure(self, duration):
+        """Return the mean RMS energy of the next `duration` seconds of audio."""
+        source = self.source
+        chunks = max(int(duration * source.SAMPLE_RATE / source.CHUNK), 1)
+        total = 0
+        for _ in range(chunks):
+            total += audioop.rms(source.stream.read(source.CHUNK), source.SAMPLE_WIDTH)
+        return total / chunks
+
+    def calibrate(self):
+        """Measure the noise floor for the full calibration duration and set the threshold."""
+        started = time.monotonic()
+        self._flush()
+        self.calibrated_floor = self.floor = self._measure(self.calibration_duration)
+        self.recognizer.energy_threshold = max(self.floor * self.recognizer.dynamic_energy_ratio, 1)
+        metrics.observe("mic.calibration", time.monotonic() - started)
+
+    def check(self):
+        """Probe the noise floor before a turn and recalibrate if it has drifted."""
+        started = time.monotonic()
+        self._flush()
+        level = self._measure(self.probe_duration)
+        self.floor = self.floor * (1 - self.smoothing) + level * self.smoothing
+        ratio = self.floor / max(self.calibrated_floor, 1)
+        if ratio > self.drift_ratio or ratio < 1 / self.drift_ratio:
+            metrics.incr("mic.recalibrations")
+            self.calibrate()
+        elapsed = time.monotonic() - started
+        metrics.observe("mic.pre_listen", elapsed)
+        # Compared with recalibrating for the full duration on every turn
+        metrics.incr("mic.saved_ms", int(max(self.calibration_duration - elapsed, 0) * 1000))
+        return elapsed
+
+
+class VoiceOnsetDetector:
+    """Call `on_onset` as soon as speech starts, while listen() is still recording.
+
+    Wraps `source.stream`, so everything that reads the microphone reads
+    through it unchanged. A buffer whose RMS energy rises above the
+    recognizer's energy_threshold after a quieter one is the same test
+    listen() uses to decide a phrase has started. It also fires on the
+    pauses between words, so `on_onset` should ignore repeats.
+    """
+
+    def __init__(self, recognizer, source, on_onset):
+        self.recognizer = recognizer
+        self.stream = source.stream
+        self.sample_width = source.SAMPLE_WIDTH
+        self.on_onset = on_onset
+        self.speaking = False
+        source.stream = self
+
+    def read(self, size):
+        buffer = self.stream.read(size)
+        speaking = audioop.rms(buffer, self.sample_width) > self.recognizer.energy_threshold
+        if speaking and not self.speaking:
+            metrics.incr("mic.onsets")
+            try:
+                self.on_onset()
+            except Exception as e:
+                print(f"Error handling voice onset: {e}")
+        self.speaking = speaking
+        return buffer
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
@@ -0,0 +1,286 @@
+# pipeline.py
+import queue
+import threading
+import time
+
+import speech_recognition as sr
+
+from llm import stream_reply
+from metrics import metrics
+
+STOP_WORDS = ["stop", "exit"]
+
+
+class ContextPrefetch:
+    """Build the prompt context in the background as soon as the user starts speaking.
+
+    start() is called on voice onset and runs `build_context` in the
+    background, overlapping capture and transcription. take() hands that result
+    to the reply, waiting for it if it's still being built; without a
+    prefetch younger than `max_age` seconds it builds the context inline.
+    Hits, misses and the time taken off the reply path are recorded as
+    prefetch.hits, prefetch.misses, prefetch.saved_ms and the
+    prefetch.hit_rate gauge. The build is started with `spawn(func, *args)`,
+    a thread of its own unless one is given (main.py uses the I/O engine).
+    """
+
+    def __init__(self, build_context, max_age=30, spawn=None):
+        self.build_context = build_context
+        self.max_age = max_age
+        self.spawn = spawn or (lambda func, *args: threading.Thread(target=func, args=args, name="prefetch", daemon=True).start())
+        self.lock = threading.Lock()
+        self.pending = None
+        self.hits = 0
+        self.misses = 0
+
+    def start(self):
+        with self.lock:
+            if self.pending is not None:
+                if time.monotonic() - self.pending["started"] < self.max_age:
+                    # Already building for this utterance (onsets also fire between words)
+                    return
+                metrics.incr("prefetch.unused")
+            pending = {"started": time.monotonic(), "done": threading.Event(), "sections": None, "elapsed": 0.0}
+            self.pending = pending
+        self.spawn(self._build, pending)
+
+    def _build(self, pending):
+        started = time.monotonic()
+        try:
+            pending["sections"] = self.build_context()
+        except Exception as e:
+            print(f"Error prefetching context: {e}")
+        pending["elapsed"] = time.monotonic() - started
+        pending["done"].set()
+
+    def take(self):
+        """Return the context sections, from the prefetch when a fresh one exists."""
+        with self.lock:
+            pending, self.pending = self.pending, None
+        if pending is not None and time.monotonic() - pending["started"] < self.max_age:
+            waited_from = time.monotonic()
+            pending["done"].wait()
+            waited = time.monotonic() - waited_from
+            if pending["sections"] is not None:
+                self.hits += 1
+                metrics.incr("prefetch.hits")
+                metrics.incr("prefetch.saved_ms", int(max(pending["elapsed"] - waited, 0) * 1000))
+                self._publish_rate()
+                return pending["sections"]
+        self.misses += 1
+        metrics.incr("prefetch.misses")
+        self._publish_rate()
+        return self.build_context()
+
+    def discard(self):
+        """Drop the prefetch for an utterance that didn't need the context."""
+        with self.lock:
+            pending, self.pending = self.pending, None
+        if pending is not None:
+            metrics.incr("prefetch.unused")
+
+    def _publish_rate(self):
+        metrics.set("prefetch.hit_rate", round(self.hits / (self.hits + self.misses), 3))
+
+
+class ConversationPipeline:
+    """Voice conversation split into capture, recognition, reasoning and speech stages.
+
+    Each stage runs on its own thread and hands work to the next through a
+    queue, so the microphone keeps listening while a reply is generated and
+    spoken. A newly recognized utterance interrupts the reply in flight: the
+    speech queue is cut off and the LLM stream is closed. Saying "stop" while
+    a reply is playing only interrupts it; otherwise "stop"/"exit" ends the
+    conversation as before.
+
+    Each stage is timed under pipeline.<stage> (calibrate, listen, stt,
+    context, generate); the SpeechQueue times pipeline.speak. The items
+    waiting in front of each stage are published as the
+    pipeline.queue.<stage> gauges (recognition, reasoning, speech).
+
+    With `barge_in` disabled the stages still run separately, but capture
+    waits for each turn to finish before listening again.
+
+    A `router` (see intents.py) gets the first look at each prompt; the
+    questions it can answer from local data skip the model entirely.
+
+    With `prefetch_context` on, on_voice_onset() (wired to a
+    VoiceOnsetDetector) starts building the context while the user is
+    still speaking, so it is usually ready when the transcript arrives.
+    `spawn` is passed on to ContextPrefetch.
+    """
+
+    def __init__(self, recognizer, source, noise_monitor, stt, session, speech, config, build_context, show,
+                 router=None, spawn=None):
+        self.recognizer = recognizer
+        self.source = source
+        self.noise_monitor = noise_monitor
+        self.stt = stt
+        self.session = session
+        self.speech = speech
+        self.stream = config["llm"]["stream"]
+        self.barge_in = config["conversation"]["barge_in"]
+        self.phrase_time_limit = config["conversation"]["phrase_time_limit"]
+        self.build_context = build_context
+        self.prefetch = None
+        if config["conversation"]["prefetch_context"]:
+            self.prefetch = ContextPrefetch(build_context, config["conversation"]["prefetch_max_age"], spawn)
+        self.show = show
+        self.router = router
+        self.audio = queue.Queue()
+        self.prompts = queue.Queue()
+        self.turn = 0
+        self.replying = threading.Event()
+        self.turn_done = threading.Event()
+        self.turn_done.set()
+        self.stopped = threading.Event()
+
+    def _publish_depths(self):
+        metrics.set("pipeline.queue.recognition", self.audio.qsize())
+        metrics.set("pipeline.queue.reasoning", self.prompts.qsize())
+
+    def run(self):
+        """Start the recognition and reasoning stages and capture on this thread until exit."""
+        threading.Thread(target=self._recognize, name="recognition", daemon=True).start()
+        threading.Thread(target=self._reason, name="reasoning", daemon=True).start()
+        self._capture()
+
+    def busy(self):
+        return self.replying.is_set() or self.speech.busy()
+
+    def on_voice_onset(self):
+        """Speech has started on the microphone. Safe to call from any thread."""
+        if self.prefetch is not None:
+            self.prefetch.start()
+
+    def interrupt(self):
+        """Cancel the reply in flight. Returns True if there was one."""
+        was_busy = self.busy()
+        self.turn += 1
+        self.speech.interrupt()
+        return was_busy
+
+    # --- Stages ---
+    def _capture(self):
+        announced = False
+        while not self.stopped.is_set():
+            if not self.barge_in:
+                self.turn_done.wait()
+            if not announced and self.turn_done.is_set() and not self.busy():
+                # Probe the noise floor only while we're quiet, not over our own TTS
+                with metrics.span("pipeline.calibrate"):
+                    self.noise_monitor.check()
+                self.show("\nListening for your prompt...")
+                announced = True
+            started = time.monotonic()
+            try:
+                # Short timeout so the loop can notice a stop between utterances
+                audio_data = self.recognizer.listen(self.source, timeout=1, phrase_time_limit=self.phrase_time_limit)
+            except sr.WaitTimeoutError:
+                continue
+            except Exception as e:
+                self.show(f"\nError: {e}\n")
+                continue
+            # Only captures count; timeouts while waiting for speech are idle time
+            metrics.observe("pipeline.listen", time.monotonic() - started)
+            announced = False
+            self.turn_done.clear()
+            self.audio.put(audio_data)
+            self._publish_depths()
+
+    def _recognize(self):
+        while not self.stopped.is_set():
+            audio_data = self.audio.get()
+            self._publish_depths()
+            try:
+                with metrics.span("pipeline.stt"):
+                    prompt = self.stt.transcribe(audio_data)
+            except sr.UnknownValueError:
+                # Don't complain about echo or background noise picked up mid-reply
+                if not self.busy():
+                    self.show("\nCould not understand audio. Please try again.\n")
+                self.turn_done.set()
+                continue
+            except sr.RequestError as e:
+                self.show(f"\nSpeech service error: {e}\n")
+                self.turn_done.set()
+                continue
+            except Exception as e:
+                self.show(f"\nError: {e}\n")
+                self.turn_done.set()
+                continue
+            self.show(f"\nYou said: {prompt}")
+            interrupted = self.interrupt()
+            if prompt.lower() in STOP_WORDS:
+                if interrupted and prompt.lower() == "stop":
+                    self.show("\nStopped.\n")
+                    self.turn_done.set()
+                    continue
+                self.show("\nExiting Conversation.\n")
+                self.stopped.set()
+                self.turn_done.set()
+                break
+            self.prompts.put((self.turn, prompt))
+            self._publish_depths()
+
+    def _reason(self):
+        while not self.stopped.is_set():
+            turn, prompt = self.prompts.get()
+            self._publish_depths()
+            if turn != self.turn:
+                # A newer utterance arrived before this one was picked up
+                continue
+            self.replying.set()
+            try:
+                self._reply(turn, prompt)
+            except Exception as e:
+                self.show(f"\nError: {e}\n")
+            finally:
+                self.replying.clear()
+            if not self.barge_in:
+                self.speech.wait()
+            self.turn_done.set()
+
+    def _reply(self, turn, prompt):
+        def cancelled():
+            return turn != self.turn
+
+        # Time to first word is measured from here, once the transcript is in
+        self.speech.start_turn()
+        # Time, date, weather and calendar questions are answered from local data when possible
+        local_reply = self.router.answer(prompt) if self.router is not None else None
+        if local_reply is not None:
+            # Its prefetched context would otherwise be handed to the next utterance
+            if self.prefetch is not None:
+                self.prefetch.discard()
+            self.show(f"\nAssistant Response: {local_reply}\n")
+            self.speech.say(local_reply)
+            self.session.record_turn(prompt, local_reply, generated=False)
+            return
+        # Get API context and build the augmented prompt
+        with metrics.span("pipeline.context"):
+            sections = self.prefetch.take() if self.prefetch is not None else self.build_context()
+        augmented_prompt = self.session.build_prompt(sections, prompt)
+        # (Augmented prompt is used for the LLM call but not shown in the text widget)
+        if self.stream:
+            # Show tokens as they arrive and start speaking each sentence as soon as it is complete
+            self.show("\nAssistant Response: ")
+            with metrics.span("pipeline.generate"):
+                model_reply = stream_reply(
+                    self.session, augmented_prompt,
+                    on_token=self.show,
+                    on_sentence=lambda sentence: cancelled() or self.speech.say(sentence),
+                    cancelled=cancelled,
+                )
+            self.show("\n")
+            # A cut-off reply is remembered as far as it got
+            self.session.record_turn(prompt, model_reply)
+        else:
+            with metrics.span("pipeline.generate"):
+                response = self.session.generate(augmented_prompt)
+            if cancelled():
+                return
+            model_reply = response.response
+            self.show(f"\nAssistant Response: {model_reply}\n")
+            self.speech.say(model_reply)
+            self.session.record_turn(prompt, model_reply)
@@ -0,0 +1,103 @@
+# scheduler.py
+import asyncio
+import random
+import threading
+import time
+
+from metrics import metrics
+
+
+class FetchScheduler:
+    """Run blocking fetches on the engine's worker pool and deliver the results on the Tk thread.
+
+    Each source has its own interval, jitter and timeout and its own task
+    on the engine loop, so sources refresh concurrently. A fetch that runs
+    past its timeout is cancelled and counted; results are handed to the
+    source's callback through the Tk bridge.
+    """
+
+    def __init__(self, engine, bridge):
+        self.engine = engine
+        self.bridge = bridge
+        self.sources = {}
+        self.running = set()
+
+    def add_source(self, name, fetch, on_result, interval, jitter=0, timeout=30, delay=0):
+        """Register a fetch to run every `interval` seconds (+/- `jitter`)."""
+        self.sources[name] = {
+            "fetch": fetch,
+            "on_result": on_result,
+            "interval": interval,
+            "jitter": jitter,
+            "timeout": timeout,
+        }
+        self.engine.submit(self._every(name, delay))
+
+    def _next_delay(self, source):
+        delay = source["interval"] + random.uniform(-source["jitter"], source["jitter"])
+        return max(delay, 1)
+
+    async def _every(self, name, delay):
+        await asyncio.sleep(delay)
+        while True:
+            await self._fetch(name)
+            await asyncio.sleep(self._next_delay(self.sources[name]))
+
+    async def _fetch(self, name):
+        if name in self.running:
+            # The previous fetch is still in flight; don't stack another on top.
+            metrics.incr(f"scheduler.{name}.skipped")
+            return
+        source = self.sources[name]
+        self.running.add(name)
+        started = time.monotonic()
+        try:
+            result = await self.engine.run_blocking(self._job, source["fetch"], timeout=source["timeout"])
+        except asyncio.TimeoutError:
+            print(f"Fetching {name} timed out after {source['timeout']}s")
+            metrics.incr(f"scheduler.{name}.timeouts")
+            return
+        except Exception as e:
+            print(f"Error fetching {name}: {e}")
+            metrics.incr(f"scheduler.{name}.errors")
+            return
+        finally:
+            self.running.discard(name)
+            metrics.observe(f"scheduler.{name}.fetch", time.monotonic() - started)
+        self.bridge.call(self._deliver, name, result)
+
+    def _job(self, fetch):
+        if threading.current_thread() is threading.main_thread():
+            metrics.incr("scheduler.ui_thread_fetches")
+        return fetch()
+
+    def _deliver(self, name, result):
+        try:
+            self.sources[name]["on_result"](result)
+        except Exception as e:
+            print(f"Error updating {name}: {e}")
+
+
+class UILagMonitor:
+    """Measure how late Tk timers fire, as a check that nothing blocks the UI thread.
+
+    A tick is scheduled every `interval_ms`; any extra delay before it actually
+    runs is time the Tk thread spent busy. The lag is recorded under
+    `ui.lag` and ticks later than `budget_ms` are counted as `ui.stalls`.
+    """
+
+    def __init__(self, root, interval_ms=100, budget_ms=50):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.budget_ms = budget_ms
+        self.expected = time.monotonic() + interval_ms / 1000
+        self.root.after(interval_ms, self._tick)
+
+    def _tick(self):
+        now = time.monotonic()
+        lag = max(now - self.expected, 0.0)
+        metrics.observe("ui.lag", lag)
+        if lag * 1000 > self.budget_ms:
+            metrics.incr("ui.stalls")
+        self.expected = now + self.interval_ms / 1000
+        self.root.after(self.interval_ms, self._tick)
@@ -0,0 +1,229 @@
+# speech_cache.py
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import wave
+from collections import OrderedDict
+
+from metrics import metrics
+
+
+class Clip:
+    """Synthesized speech as raw PCM frames plus the format needed to play them."""
+
+    def __init__(self, frames, channels, sample_width, rate):
+        self.frames = frames
+        self.channels = channels
+        self.sample_width = sample_width
+        self.rate = rate
+
+    @classmethod
+    def load(cls, path):
+        with wave.open(path, "rb") as f:
+            return cls(f.readframes(f.getnframes()), f.getnchannels(), f.getsampwidth(), f.getframerate())
+
+    def save(self, path):
+        with wave.open(path, "wb") as f:
+            f.setnchannels(self.channels)
+            f.setsampwidth(self.sample_width)
+            f.setframerate(self.rate)
+            f.writeframes(self.frames)
+
+
+class ClipCache:
+    """LRU cache of synthesized clips keyed by (text, voice, rate), with an optional disk tier.
+
+    The memory tier holds at most `memory_max_mb` of audio. With `disk_dir`
+    set, every clip is also written there as a WAV file and read back on a
+    memory miss; the oldest files are pruned once the directory grows past
+    `disk_max_mb`. Hits and misses are counted as tts_cache.memory_hits,
+    tts_cache.disk_hits and tts_cache.misses, with the tts_cache.hit_rate,
+    tts_cache.bytes and tts_cache.clips gauges alongside.
+    """
+
+    def __init__(self, memory_max_mb=32, disk_dir=None, disk_max_mb=256):
+        self.memory_max_bytes = int(memory_max_mb * 1024 * 1024)
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = int(disk_max_mb * 1024 * 1024)
+        self.lock = threading.Lock()
+        self.clips = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, hashlib.sha1(repr(key).encode()).hexdigest() + ".wav")
+
+    def get(self, key):
+        """Return the cached clip for `key`, or None."""
+        with self.lock:
+            clip = self.clips.get(key)
+            if clip is not None:
+                self.clips.move_to_end(key)
+        if clip is not None:
+            self._count("memory_hits")
+            return clip
+        if self.disk_dir and os.path.exists(self._path(key)):
+            try:
+                clip = Clip.load(self._path(key))
+            except (OSError, wave.Error, EOFError) as e:
+                print(f"Error reading cached speech: {e}")
+            else:
+                self._remember(key, clip)
+                self._count("disk_hits")
+                return clip
+        self._count("misses")
+        return None
+
+    def put(self, key, clip):
+        self._remember(key, clip)
+        if self.disk_dir:
+            try:
+                clip.save(self._path(key))
+                self._prune_disk()
+            except OSError as e:
+                print(f"Error writing cached speech: {e}")
+
+    def _remember(self, key, clip):
+        with self.lock:
+            old = self.clips.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old.frames)
+            self.clips[key] = clip
+            self.bytes += len(clip.frames)
+            while self.bytes > self.memory_max_bytes and len(self.clips) > 1:
+                _, evicted = self.clips.popitem(last=False)
+                self.bytes -= len(evicted.frames)
+                metrics.incr("tts_cache.evictions")
+            metrics.set("tts_cache.bytes", self.bytes)
+            metrics.set("tts_cache.clips", len(self.clips))
+
+    def _prune_disk(self):
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            path = os.path.join(self.disk_dir, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def _count(self, outcome):
+        metrics.incr(f"tts_cache.{outcome}")
+        with self.lock:
+            if outcome == "misses":
+                self.misses += 1
+            else:
+                self.hits += 1
+            metrics.set("tts_cache.hit_rate", round(self.hits / (self.hits + self.misses), 3))
+
+
+class WavPlayer:
+    """Play clips through PyAudio, in small chunks so stop() takes effect quickly."""
+
+    chunk_frames = 1024
+
+    def __init__(self):
+        import pyaudio
+        self.pyaudio = pyaudio.PyAudio()
+        self.stopped = threading.Event()
+
+    def play(self, clip):
+        self.stopped.clear()
+        stream = self.pyaudio.open(
+            format=self.pyaudio.get_format_from_width(clip.sample_width),
+            channels=clip.channels,
+            rate=clip.rate,
+            output=True,
+        )
+        step = self.chunk_frames * clip.channels * clip.sample_width
+        try:
+            for offset in range(0, len(clip.frames), step):
+                if self.stopped.is_set():
+                    break
+                stream.write(clip.frames[offset:offset + step])
+        finally:
+            stream.stop_stream()
+            stream.close()
+
+    def stop(self):
+        self.stopped.set()
+
+
+class CachingEngine:
+    """A pyttsx3-style engine that replays cached clips instead of synthesizing again.
+
+    Drop-in for the engine SpeechQueue drives (say / runAndWait / stop).
+    A phrase is spoken live by the wrapped engine until it has been asked
+    for `min_uses` times; from then on it is rendered to a clip once with
+    save_to_file(), cached, and played back directly. Unique LLM sentences
+    therefore cost nothing extra, while fixed phrases and template answers
+    start playing immediately. Rendering is timed as tts.synthesize. If a
+    render fails (e.g. a driver that can't write WAV files, like macOS's
+    nsss, which always writes AIFF), rendering is turned off and every
+    phrase is spoken live from then on.
+    """
+
+    def __init__(self, engine, cache, player=None, min_uses=2):
+        self.engine = engine
+        self.cache = cache
+        self.player = player or WavPlayer()
+        self.min_uses = min_uses
+        self.uses = OrderedDict()
+        self.text = ""
+        self.render_failed = False
+
+    def key(self, text):
+        return (text, self.engine.getProperty("voice"), self.engine.getProperty("rate"))
+
+    def say(self, text):
+        self.text = text
+
+    def runAndWait(self):
+        key = self.key(self.text)
+        clip = self.cache.get(key)
+        if clip is None and self._count_use(key) >= self.min_uses and not self.render_failed:
+            clip = self._render(key)
+        if clip is None:
+            self.engine.say(self.text)
+            self.engine.runAndWait()
+            return
+        self.player.play(clip)
+
+    def _count_use(self, key):
+        # Bounded, like the cache: only recent phrases need counting
+        uses = self.uses.pop(key, 0) + 1
+        self.uses[key] = uses
+        while len(self.uses) > 1024:
+            self.uses.popitem(last=False)
+        return uses
+
+    def _render(self, key):
+        started = time.monotonic()
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self.engine.save_to_file(self.text, path)
+            self.engine.runAndWait()
+            clip = Clip.load(path)
+        except Exception as e:
+            print(f"Error rendering speech, speaking without the cache from now on: {e}")
+            self.render_failed = True
+            metrics.incr("tts_cache.render_errors")
+            return None
+        finally:
+            os.remove(path)
+        metrics.observe("tts.synthesize", time.monotonic() - started)
+        self.cache.put(key, clip)
+        return clip
+
+    def stop(self):
+        self.player.stop()
+        self.engine.stop()
@@ -0,0 +1,271 @@
+# speech_workers.py
+import itertools
+import multiprocessing
+import pickle
+import queue
+import threading
+import time
+
+from metrics import metrics
+
+
+class WorkerError(RuntimeError):
+    """The worker process died, hung or was restarted before a call finished."""
+
+
+def _serve(build, build_args, requests, replies, control):
+    """Child process main loop: build the handler, then answer calls until told to exit."""
+    built = {}
+
+    def watch_control():
+        # Runs beside the call loop so pings and stop() get through while a call is busy
+        # (or while a slow build, like loading a Vosk model, is still going)
+        while True:
+            message_id, message = control.get()
+            if message == "ping":
+                replies.put((message_id, True, "pong"))
+            elif "handler" in built:
+                try:
+                    getattr(built["handler"], message)()
+                except Exception as e:
+                    print(f"Error handling {message} in worker: {e}")
+
+    threading.Thread(target=watch_control, daemon=True).start()
+    handler = built["handler"] = build(*build_args)
+    while True:
+        call_id, method, args = requests.get()
+        if method is None:
+            return
+        try:
+            replies.put((call_id, True, getattr(handler, method)(*args)))
+        except Exception as e:
+            try:
+                pickle.dumps(e)
+            except Exception:
+                e = RuntimeError(repr(e))
+            replies.put((call_id, False, e))
+
+
+class WorkerProcess:
+    """Host an object in a child process and call its methods over queues.
+
+    `build(*build_args)` runs in the child to create the object; both must
+    be picklable (module-level functions and plain data). A supervisor
+    thread pings the child every `health_interval` seconds and restarts it
+    if it has exited or doesn't answer within `health_timeout`. A call that
+    takes longer than `call_timeout` is treated as a hang and also restarts
+    it. Calls in flight during a restart raise WorkerError.
+
+    Metrics: worker.<name>.call (latency), worker.<name>.ping and the
+    worker.<name>.restarts / .timeouts counters.
+    """
+
+    def __init__(self, name, build, build_args=(), call_timeout=60, health_interval=5, health_timeout=2):
+        self.name = name
+        self.build = build
+        self.build_args = build_args
+        self.call_timeout = call_timeout
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        # spawn, not fork: the parent has Tk and a dozen threads that must not be copied
+        self.context = multiprocessing.get_context("spawn")
+        self.ids = itertools.count()
+        self.lock = threading.Lock()
+        self.restart_lock = threading.Lock()
+        self.pending = {}
+        self.process = None
+        self.closed = False
+        self._spawn()
+        threading.Thread(target=self._supervise, name=f"{name}-supervisor", daemon=True).start()
+
+    def _spawn(self):
+        with self.lock:
+            self.requests = self.context.Queue()
+            self.replies = self.context.Queue()
+            self.control = self.context.Queue()
+            self.process = self.context.Process(
+                target=_serve,
+                args=(self.build, self.build_args, self.requests, self.replies, self.control),
+                name=f"{self.name}-worker",
+                daemon=True,
+            )
+            self.process.start()
+            process, replies = self.process, self.replies
+        threading.Thread(target=self._read_replies, args=(process, replies), daemon=True).start()
+
+    def _read_replies(self, process, replies):
+        # One reader per child; it exits once that child has been replaced
+        while process is self.process:
+            try:
+                message_id, ok, result = replies.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            with self.lock:
+                waiter = self.pending.pop(message_id, None)
+            if waiter is not None:
+                waiter["ok"], waiter["result"] = ok, result
+                waiter["done"].set()
+
+    def _send(self, channel, message):
+        message_id = next(self.ids)
+        waiter = {"done": threading.Event(), "ok": False, "result": None}
+        with self.lock:
+            self.pending[message_id] = waiter
+            target = self.requests if channel == "request" else self.control
+        target.put((message_id, *message) if channel == "request" else (message_id, message))
+        return message_id, waiter
+
+    def call(self, method, *args):
+        """Run `method(*args)` in the child and return its result (or raise its exception)."""
+        started = time.monotonic()
+        process = self.process
+        message_id, waiter = self._send("request", (method, args))
+        if not waiter["done"].wait(self.call_timeout):
+            with self.lock:
+                self.pending.pop(message_id, None)
+            metrics.incr(f"worker.{self.name}.timeouts")
+            self.restart(f"{method} took longer than {self.call_timeout}s", process)
+            raise WorkerError(f"{self.name} worker timed out in {method}")
+        metrics.observe(f"worker.{self.name}.call", time.monotonic() - started)
+        if not waiter["ok"]:
+            raise waiter["result"]
+        return waiter["result"]
+
+    def signal(self, message):
+        """Call a no-argument method in the child without waiting (e.g. "stop")."""
+        with self.lock:
+            control = self.control
+        control.put((next(self.ids), message))
+
+    def ping(self):
+        """True if the child answered a ping within `health_timeout`."""
+        started = time.monotonic()
+        message_id, waiter = self._send("control", "ping")
+        if not waiter["done"].wait(self.health_timeout):
+            with self.lock:
+                self.pending.pop(message_id, None)
+            return False
+        metrics.observe(f"worker.{self.name}.ping", time.monotonic() - started)
+        return True
+
+    def _supervise(self):
+        while not self.closed:
+            time.sleep(self.health_interval)
+            if self.closed:
+                return
+            process = self.process
+            if not process.is_alive():
+                self.restart(f"exited with code {process.exitcode}", process)
+            elif not self.ping():
+                self.restart(f"no answer to ping within {self.health_timeout}s", process)
+
+    def restart(self, reason, process=None):
+        """Replace the child process; calls still waiting on the old one fail.
+
+        With `process` given, nothing happens if it has already been replaced
+        (the supervisor and a timed-out call can notice the same failure).
+        """
+        with self.restart_lock:
+            if self.closed or (process is not None and process is not self.process):
+                return
+            print(f"Restarting {self.name} worker: {reason}")
+            metrics.incr(f"worker.{self.name}.restarts")
+            old = self.process
+            with self.lock:
+                pending, self.pending = self.pending, {}
+            for waiter in pending.values():
+                waiter["result"] = WorkerError(f"{self.name} worker restarted: {reason}")
+                waiter["done"].set()
+            old.terminate()
+            old.join(1)
+            self._spawn()
+
+    def close(self):
+        self.closed = True
+        try:
+            self.requests.put((None, None, None))
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+# --- Child-side handlers (built inside the worker process) ---
+class _STTHandler:
+    def __init__(self, config):
+        import speech_recognition as sr
+        from stt import SpeechToText
+        self.stt = SpeechToText(sr.Recognizer(), config)
+
+    def transcribe(self, audio_data):
+        return self.stt.transcribe(audio_data)
+
+
+class _TTSHandler:
+    def __init__(self, config):
+        from tts import make_engine_factory
+        self.engine = make_engine_factory(config)()
+
+    def speak(self, text):
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def stop(self):
+        self.engine.stop()
+
+
+def build_stt(config):
+    return _STTHandler(config)
+
+
+def build_tts(config):
+    return _TTSHandler(config)
+
+
+def _worker(name, build, config, worker_config):
+    return WorkerProcess(
+        name, build, (config,),
+        call_timeout=worker_config["call_timeout"],
+        health_interval=worker_config["health_interval"],
+        health_timeout=worker_config["health_timeout"],
+    )
+
+
+class ProcessSTT:
+    """SpeechToText running in a worker process; same transcribe() interface."""
+
+    def __init__(self, config, build=build_stt):
+        self.worker = _worker("stt", build, config["stt"], config["speech_workers"])
+
+    def transcribe(self, audio_data):
+        return self.worker.call("transcribe", audio_data)
+
+    def close(self):
+        self.worker.close()
+
+
+class ProcessSpeechEngine:
+    """A pyttsx3-style engine (say / runAndWait / stop) whose speech runs in a worker process.
+
+    Pass it to SpeechQueue as the engine factory. stop() goes over the
+    control queue, so it interrupts a sentence that is still playing.
+    """
+
+    def __init__(self, config, build=build_tts):
+        self.worker = _worker("tts", build, config["tts"], config["speech_workers"])
+        self.text = ""
+
+    def say(self, text):
+        self.text = text
+
+    def runAndWait(self):
+        self.worker.call("speak", self.text)
+
+    def stop(self):
+        self.worker.signal("stop")
+
+    def close(self):
+        self.worker.close()
@@ -0,0 +1,68 @@
+# status_server.py
+import asyncio
+import json
+import time
+
+from metrics import metrics
+
+
+class StatusServer:
+    """Small asyncio HTTP server for monitoring the mirror remotely.
+
+    GET /status returns `status()` and GET /metrics returns `stats()`, both
+    as JSON. The callables only read data the workers keep up to date
+    (cache values, metrics, the transcript's line buffer), so a request
+    never waits on or touches the Tk thread. serve() runs on the caller's
+    event loop (the I/O engine's, in main.py).
+    """
+
+    def __init__(self, host, port, status, stats):
+        self.host = host
+        self.port = port
+        self.routes = {"/status": status, "/metrics": stats}
+        self.server = None
+
+    async def serve(self):
+        try:
+            self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as e:
+            print(f"Status server could not listen on {self.host}:{self.port}: {e}")
+            return
+        print(f"Status server listening on http://{self.host}:{self.port}/status")
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        started = time.monotonic()
+        try:
+            request = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Skip the headers; nothing here needs them
+            while (await asyncio.wait_for(reader.readline(), timeout=5)).strip():
+                pass
+            method, path, _ = request.decode("latin-1").split(" ", 2)
+            path = path.split("?", 1)[0]
+            if method != "GET":
+                status, body = 405, {"error": f"{method} not allowed"}
+            elif path not in self.routes:
+                status, body = 404, {"error": f"No route for {path}", "routes": sorted(self.routes)}
+            else:
+                status, body = 200, self.routes[path]()
+        except (asyncio.TimeoutError, ValueError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            status, body = 500, {"error": str(e)}
+        data = json.dumps(body, default=str).encode()
+        reason = {200: "OK", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+        metrics.observe("status_server.request", time.monotonic() - started)
+        metrics.incr(f"status_server.{status}")
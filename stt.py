@@ -0,0 +1,105 @@
+# stt.py
+import json
+import time
+
+import speech_recognition as sr
+
+from metrics import metrics
+
+
+class GoogleBackend:
+    """Online recognition through the Google Web Speech API (needs network)."""
+
+    name = "google"
+
+    def __init__(self, recognizer, config):
+        self.recognizer = recognizer
+        self.language = config.get("language", "en-US")
+
+    def transcribe(self, audio_data):
+        return self.recognizer.recognize_google(audio_data, language=self.language)
+
+
+class VoskBackend:
+    """Offline recognition with a local Vosk model.
+
+    The model directory is loaded once and reused for every utterance.
+    Download a model from https://alphacephei.com/vosk/models and point
+    `stt.vosk_model` in config.py at it.
+    """
+
+    name = "vosk"
+    sample_rate = 16000
+
+    def __init__(self, recognizer, config):
+        try:
+            import vosk
+        except ImportError:
+            raise sr.RequestError("Offline STT needs the vosk package (pip install vosk)")
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(config["vosk_model"])
+
+    def transcribe(self, audio_data):
+        rec = self.vosk.KaldiRecognizer(self.model, self.sample_rate)
+        rec.AcceptWaveform(audio_data.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+        text = json.loads(rec.FinalResult()).get("text", "")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+backends = {
+    GoogleBackend.name: GoogleBackend,
+    VoskBackend.name: VoskBackend,
+}
+
+
+def create_backend(name, recognizer, config):
+    """Build the STT backend registered under `name`."""
+    if name not in backends:
+        raise ValueError(f"Unknown STT backend: {name} (choose from {', '.join(backends)})")
+    return backends[name](recognizer, config)
+
+
+class SpeechToText:
+    """Transcribe audio with the configured backend, falling back on request errors.
+
+    The fallback backend is only built the first time it is needed, so an
+    unused offline model costs nothing at startup. If it can't be built (no
+    vosk package, missing model) that is reported once and the primary's
+    RequestError is raised as if no fallback were configured.
+    """
+
+    def __init__(self, recognizer, config):
+        self.recognizer = recognizer
+        self.config = config
+        self.primary = create_backend(config["backend"], recognizer, config)
+        self.fallback = None
+        self.fallback_failed = False
+
+    def _fallback(self):
+        if self.fallback is None and self.config.get("fallback") and not self.fallback_failed:
+            try:
+                self.fallback = create_backend(self.config["fallback"], self.recognizer, self.config)
+            except Exception as e:
+                print(f"{self.config['fallback']} STT fallback unavailable: {e}")
+                self.fallback_failed = True
+        return self.fallback
+
+    def transcribe(self, audio_data):
+        try:
+            return self._timed(self.primary, audio_data)
+        except sr.RequestError as e:
+            fallback = self._fallback()
+            if fallback is None:
+                raise
+            print(f"{self.primary.name} STT failed ({e}), using {fallback.name}")
+            return self._timed(fallback, audio_data)
+
+    def _timed(self, backend, audio_data):
+        started = time.monotonic()
+        try:
+            return backend.transcribe(audio_data).strip()
+        finally:
+            metrics.observe(f"stt.{backend.name}", time.monotonic() - started)
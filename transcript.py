@@ -0,0 +1,56 @@
+# transcript.py
+import time
+import tkinter as tk
+from collections import deque
+
+from metrics import metrics
+
+
+class Transcript:
+    """Bounded scrollback for the conversation Text widget.
+
+    Keeps at most `max_lines` lines in the widget; each append trims the
+    oldest lines off the top, so insert and layout cost stay flat however
+    long the mirror runs. Trimmed lines are appended to `spill_path` if one
+    is given. The most recent lines are also kept in `lines` so they can be
+    read without touching Tk.
+
+    append() must run on the Tk thread.
+    """
+
+    def __init__(self, widget, max_lines=200, spill_path=None):
+        self.widget = widget
+        self.max_lines = max_lines
+        self.lines = deque([""], maxlen=max_lines)
+        self.spill = open(spill_path, "a", encoding="utf-8") if spill_path else None
+
+    def append(self, text):
+        started = time.monotonic()
+        self.widget.insert(tk.END, text)
+        self._trim()
+        self.widget.see(tk.END)
+        head, *rest = text.split("\n")
+        self.lines[-1] += head
+        self.lines.extend(rest)
+        metrics.observe("ui.transcript_append", time.monotonic() - started)
+
+    def _trim(self):
+        line_count = int(self.widget.index("end-1c").split(".")[0])
+        excess = line_count - self.max_lines
+        if excess <= 0:
+            return
+        cut = f"{excess + 1}.0"
+        if self.spill:
+            self.spill.write(self.widget.get("1.0", cut))
+            self.spill.flush()
+        self.widget.delete("1.0", cut)
+        metrics.incr("ui.transcript_trimmed_lines", excess)
+
+    def recent(self, count=None):
+        """Return the last `count` lines (all kept lines by default) as text."""
+        lines = list(self.lines)
+        return "\n".join(lines if count is None else lines[-count:])
+
+    def close(self):
+        if self.spill:
+            self.spill.close()
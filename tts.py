@@ -0,0 +1,97 @@
+# tts.py
+import queue
+import threading
+import time
+
+import pyttsx3
+
+from metrics import metrics
+
+
+def make_engine_factory(config):
+    """Return a function that creates the TTS engine, with the clip cache if `config` enables it."""
+    if not config["cache"]:
+        return pyttsx3.init
+    from speech_cache import CachingEngine, ClipCache
+    clips = ClipCache(config["memory_max_mb"], config["disk_dir"], config["disk_max_mb"])
+    return lambda: CachingEngine(pyttsx3.init(), clips, min_uses=config["min_uses"])
+
+
+class NullEngine:
+    """Stands in when no TTS engine can be created, so queued text is still consumed."""
+
+    def say(self, text):
+        pass
+
+    def runAndWait(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class SpeechQueue:
+    """Speak queued text on a dedicated thread that owns the TTS engine.
+
+    Sentences can be queued while the LLM is still generating, so speech
+    starts as soon as the first sentence is complete. interrupt() stops the
+    current sentence and drops everything queued before it. The number of
+    sentences waiting is published as the pipeline.queue.speech gauge.
+    """
+
+    def __init__(self, engine_factory=pyttsx3.init):
+        self.engine_factory = engine_factory
+        self.engine = None
+        self.queue = queue.Queue()
+        self.generation = 0
+        self.turn_started = None
+        threading.Thread(target=self._run, name="tts", daemon=True).start()
+
+    def start_turn(self, started=None):
+        """Mark the start of a turn so the delay to the first spoken word is recorded."""
+        self.turn_started = started if started is not None else time.monotonic()
+
+    def say(self, text):
+        if text.strip():
+            self.queue.put((self.generation, text))
+            metrics.set("pipeline.queue.speech", self.queue.qsize())
+
+    def wait(self):
+        """Block until everything queued so far has been spoken."""
+        self.queue.join()
+
+    def busy(self):
+        """True while anything is queued or being spoken."""
+        return self.queue.unfinished_tasks > 0
+
+    def interrupt(self):
+        """Stop speaking now and skip everything queued so far."""
+        self.generation += 1
+        self.turn_started = None
+        if self.engine is not None and self.busy():
+            self.engine.stop()
+
+    def _run(self):
+        try:
+            engine = self.engine_factory()
+        except Exception as e:
+            # No eSpeak or no audio device: keep draining the queue so busy() and wait() still settle
+            print(f"Error starting text-to-speech, replies will not be spoken: {e}")
+            engine = NullEngine()
+        self.engine = engine
+        while True:
+            generation, text = self.queue.get()
+            metrics.set("pipeline.queue.speech", self.queue.qsize())
+            try:
+                if generation != self.generation:
+                    continue
+                if self.turn_started is not None:
+                    metrics.observe("tts.time_to_first_word", time.monotonic() - self.turn_started)
+                    self.turn_started = None
+                engine.say(text)
+                with metrics.span("pipeline.speak"):
+                    engine.runAndWait()
+            except Exception as e:
+                print(f"Error speaking: {e}")
+            finally:
+                self.queue.task_done()
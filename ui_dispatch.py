@@ -0,0 +1,53 @@
+# ui_dispatch.py
+import threading
+import time
+
+from metrics import metrics
+
+
+class UIDispatcher:
+    """Collect UI updates from worker threads and apply them on the Tk thread in batches.
+
+    Text appended to the same transcript between flushes is joined into a
+    single insert, and flushes run at most `max_hz` times a second. Nothing
+    is scheduled while there is nothing pending, so an idle display costs no
+    wakeups. Queue depth and flush time are recorded as ui.dispatch_depth and
+    ui.flush.
+    """
+
+    def __init__(self, root, max_hz=30):
+        self.root = root
+        self.interval = 1 / max_hz
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.depth = 0
+        self.scheduled = False
+        self.last_flush = 0.0
+
+    def append(self, transcript, text):
+        """Queue `text` to be appended to `transcript`. Safe to call from any thread."""
+        with self.lock:
+            self.pending.setdefault(transcript, []).append(text)
+            self.depth += 1
+            metrics.set("ui.dispatch_depth", self.depth)
+            if self.scheduled:
+                return
+            self.scheduled = True
+            delay = max(self.last_flush + self.interval - time.monotonic(), 0)
+        self.root.after(int(delay * 1000), self._flush)
+
+    def _flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.depth = 0
+            self.scheduled = False
+            self.last_flush = time.monotonic()
+            metrics.set("ui.dispatch_depth", 0)
+        started = time.monotonic()
+        for transcript, texts in pending.items():
+            try:
+                transcript.append("".join(texts))
+            except Exception as e:
+                print(f"Error updating text widget: {e}")
+        metrics.observe("ui.flush", time.monotonic() - started)
+        metrics.incr("ui.flushes")